@@ -76,6 +76,25 @@ def get_current_user(email: str = Depends(verify_token), db: Session = Depends(g
         )
     return user
 
+def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    """The signed-in user, or None for anonymous requests and invalid tokens"""
+    if not credentials:
+        return None
+    
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    
+    email = payload.get("sub")
+    if email is None:
+        return None
+    
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if user is None or not user.is_active:
+        return None
+    return user
+
 def get_current_owner(current_user: models.User = Depends(get_current_user)):
     if current_user.role != models.UserRole.OWNER:
         raise HTTPException(
@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from utils.geo import haversine_km
 
 load_dotenv()
 
@@ -10,6 +11,12 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hotel_booking.db")
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if "sqlite" in DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("haversine_km", 4, haversine_km, deterministic=True)
+
 Base = declarative_base()
 
 def get_db():
@@ -93,6 +100,30 @@ def init_database():
         except Exception as e:
             pass
             
+        # Composite indexes for hotel listings, bookings, reviews, favorites and room types
+        # (created one at a time, so a failing statement does not skip the rest)
+        for index_sql in [
+            "CREATE INDEX IF NOT EXISTS idx_hotels_created_at ON hotels(created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_hotels_price ON hotels(price_per_night, id)",
+            "CREATE INDEX IF NOT EXISTS idx_hotels_rating ON hotels(rating, id)",
+            "CREATE INDEX IF NOT EXISTS idx_hotels_owner_created ON hotels(owner_id, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_hotels_city_rating ON hotels(city, rating)",
+            "CREATE INDEX IF NOT EXISTS idx_bookings_user_created ON bookings(user_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_bookings_hotel_status_created ON bookings(hotel_id, status, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_bookings_hotel_created ON bookings(hotel_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_reviews_hotel_created ON reviews(hotel_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_reviews_booking ON reviews(booking_id)",
+            "CREATE INDEX IF NOT EXISTS idx_favorites_user_created ON user_favorite_hotels(user_id, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_favorites_user_hotel ON user_favorite_hotels(user_id, hotel_id)",
+            "CREATE INDEX IF NOT EXISTS idx_room_types_hotel_active ON room_types(hotel_id, is_active)",
+        ]:
+            try:
+                conn.execute(text(index_sql))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Failed to create index ({index_sql}): {e}")
+            
         # Add discount columns to hotels table
         try:
             result = conn.execute(text("PRAGMA table_info(hotels)"))
@@ -113,5 +144,41 @@ def init_database():
         except Exception as e:
             pass
 
+        # Materialized deals ranking
+        try:
+            from services.deals_service import deal_ranking
+            result = conn.execute(text("PRAGMA table_info(hotels)"))
+            columns = [row[1] for row in result.fetchall()]
+            
+            if 'effective_price_per_night' not in columns or 'deal_score' not in columns:
+                if 'effective_price_per_night' not in columns:
+                    conn.execute(text("ALTER TABLE hotels ADD COLUMN effective_price_per_night FLOAT"))
+                if 'deal_score' not in columns:
+                    conn.execute(text("ALTER TABLE hotels ADD COLUMN deal_score FLOAT"))
+                conn.commit()
+                deal_ranking.backfill(conn)
+            else:
+                # Rows priced only through base_price_per_night
+                deal_ranking.backfill(conn, missing_only=True)
+                
+        except Exception as e:
+            pass
+
+        # Resized image copies
+        try:
+            result = conn.execute(text("PRAGMA table_info(hotels)"))
+            columns = [row[1] for row in result.fetchall()]
+            
+            if 'image_variants' not in columns:
+                conn.execute(text("ALTER TABLE hotels ADD COLUMN image_variants JSON"))
+                conn.commit()
+                
+        except Exception as e:
+            pass
+
+        # Search, spatial and deals ranking indexes for hotels (each one created and reported separately)
+        from services.hotel_indexes import hotel_indexes
+        hotel_indexes.ensure(conn)
+
 if __name__ == "__main__":
     init_database()
@@ -1,15 +1,14 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from pathlib import Path
 import os
-from database import engine, get_db, init_database
-import models
+from database import get_db, init_database
+from services.media_files import MediaFiles
 from routes import auth, users, hotels, bookings, payments, reviews, chat, analytics, favorites, ai_chat
 
-models.Base.metadata.create_all(bind=engine)
+init_database()
 
 app = FastAPI(
     title="Hotel Booking API",
@@ -23,13 +22,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 (UPLOAD_DIR / "hotels").mkdir(exist_ok=True)
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", MediaFiles(directory="uploads"), name="uploads")
 
 security = HTTPBearer()
 
@@ -137,6 +137,10 @@ class Hotel(Base):
     tax_rate = Column(Numeric(5, 4))  # e.g., 0.1250 for 12.5%
     service_fee_rate = Column(Numeric(5, 4))
     
+    # Materialized deals ranking (maintained by services/deals_service.py)
+    effective_price_per_night = Column(Float)  # discount_price for deals, otherwise price_per_night (or base_price_per_night)
+    deal_score = Column(Float)  # Encodes is_deal, discount_percentage and rating in one sortable value
+    
     # Ratings and Reviews
     rating = Column(Float, default=0.0)  # Keep for backward compatibility
     average_rating = Column(Numeric(3, 2), default=0.0)
@@ -149,6 +153,7 @@ class Hotel(Base):
     
     # Media
     images = Column(JSON)  # List of image URLs with metadata
+    image_variants = Column(JSON)  # Resized copies per image URL (maintained by services/image_service.py)
     virtual_tour_url = Column(String)
     
     # Business Information
@@ -525,6 +530,37 @@ class Amenity(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# Normalized hotel amenities (derived from Hotel.amenities, see services/amenity_service.py)
+class HotelAmenity(Base):
+    __tablename__ = "hotel_amenities"
+    
+    hotel_id = Column(String, ForeignKey("hotels.id"), primary_key=True)
+    amenity_id = Column(String, ForeignKey("amenities.id"), primary_key=True, index=True)
+    
+    # Relationships
+    amenity = relationship("Amenity")
+
+# Precomputed "similar hotels" (rebuilt in batch by services/similarity_service.py)
+class HotelSimilarity(Base):
+    __tablename__ = "hotel_similarities"
+    
+    hotel_id = Column(String, ForeignKey("hotels.id"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 1 = most similar
+    similar_hotel_id = Column(String, ForeignKey("hotels.id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)  # 1 / (1 + feature distance)
+    computed_at = Column(DateTime)  # UTC time of the batch run
+
+# Content-addressed uploads (files and reference counts maintained by services/media_service.py)
+class MediaObject(Base):
+    __tablename__ = "media_objects"
+    
+    sha256 = Column(String(64), primary_key=True)  # Content hash, also the stored file name
+    extension = Column(String, nullable=False)  # e.g. ".jpg"
+    size = Column(Integer, nullable=False)  # Bytes
+    ref_count = Column(Integer, nullable=False, default=0, index=True)  # Hotels whose images reference the file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())  # Last ref_count change
+
 # Table for tracking booking status changes
 class BookingStatusHistory(Base):
     __tablename__ = "booking_status_history"
@@ -567,4 +603,14 @@ class AIChatHistory(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+# Version counters for cached public responses (see services/cache_service.py)
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    
+    namespace = Column(String, primary_key=True)  # "hotels", "users", "reviews:<hotel_id>"
+    version = Column(Integer, nullable=False, default=0)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -66,7 +66,7 @@ async def get_analytics_overview(
     days_in_period = (end_date - start_date).days + 1
     total_room_nights = total_rooms * days_in_period
     booked_room_nights = bookings_query.filter(Booking.status == "confirmed").with_entities(
-        func.sum(func.datediff(Booking.check_out, Booking.check_in))
+        func.sum(func.julianday(Booking.check_out_date) - func.julianday(Booking.check_in_date))
     ).scalar() or 0
     
     occupancy_rate = (booked_room_nights / total_room_nights * 100) if total_room_nights > 0 else 0
@@ -483,7 +483,7 @@ async def get_owner_hotels(
             {
                 "id": hotel.id,
                 "name": hotel.name,
-                "location": hotel.location,
+                "location": f"{hotel.city}, {hotel.country}",
                 "total_rooms": hotel.total_rooms
             }
             for hotel in hotels
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
 from typing import List
 from datetime import datetime, timedelta
@@ -11,6 +11,23 @@ import uuid
 
 router = APIRouter()
 
+
+def _listing_options():
+    """Eager-load everything BookingResponse serializes, so a listing runs a fixed number of statements"""
+    return (
+        joinedload(models.Booking.hotel).joinedload(models.Hotel.owner).load_only(models.User.full_name, models.User.username),
+        joinedload(models.Booking.review).joinedload(models.Review.user),
+    )
+
+
+def _set_listing_fields(booking: models.Booking):
+    booking.has_review = booking.review is not None
+    hotel = booking.hotel
+    if hotel is not None:
+        owner = hotel.owner
+        hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+
+
 @router.get("/", response_model=List[schemas.BookingResponse])
 def get_user_bookings(
     current_user: models.User = Depends(get_current_user),
@@ -18,7 +35,7 @@ def get_user_bookings(
 ):
     try:
         # Get user's bookings with hotel and review relationships
-        bookings = db.query(models.Booking).filter(
+        bookings = db.query(models.Booking).options(*_listing_options()).filter(
             models.Booking.user_id == current_user.id
         ).all()
         
@@ -29,12 +46,7 @@ def get_user_bookings(
             if booking.hotel_id is None or booking.hotel is None:
                 continue
             
-            # Check if booking has a review
-            has_review = db.query(models.Review).filter(
-                models.Review.booking_id == booking.id
-            ).first() is not None
-            booking.has_review = has_review
-            
+            _set_listing_fields(booking)
             valid_bookings.append(booking)
         
         return valid_bookings
@@ -352,9 +364,11 @@ def get_hotel_bookings(
     current_user: models.User = Depends(get_current_owner),
     db: Session = Depends(get_db)
 ):
-    bookings = db.query(models.Booking).join(models.Hotel).filter(
+    bookings = db.query(models.Booking).join(models.Hotel).options(*_listing_options()).filter(
         models.Hotel.owner_id == current_user.id
     ).all()
+    for booking in bookings:
+        _set_listing_fields(booking)
     return bookings
 
 # NEW: Endpoint for owner to confirm pending bookings
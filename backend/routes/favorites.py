@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, contains_eager
 from sqlalchemy import and_, or_
 from typing import List, Optional
 from database import get_db
 import models
 import schemas
 from auth.auth import get_current_user
+from services.amenity_service import amenity_index
+from utils.projection import HotelProjection
+from services.currency_service import currency_converter
 
 router = APIRouter()
 
@@ -24,6 +27,10 @@ def get_user_favorite_hotels(
     # Get user's favorite hotels with filters
     query = db.query(models.UserFavoriteHotel).join(
         models.Hotel, models.UserFavoriteHotel.hotel_id == models.Hotel.id
+    ).options(
+        contains_eager(models.UserFavoriteHotel.hotel).joinedload(models.Hotel.owner).load_only(
+            models.User.full_name, models.User.username
+        )
     ).filter(models.UserFavoriteHotel.user_id == current_user.id)
     
     # Apply filters
@@ -31,30 +38,27 @@ def get_user_favorite_hotels(
         query = query.filter(models.Hotel.city.ilike(f"%{city}%"))
     
     if min_price:
-        query = query.filter(models.Hotel.price_per_night >= min_price)
+        query = query.filter(models.Hotel.effective_price_per_night >= min_price)
     
     if max_price:
-        query = query.filter(models.Hotel.price_per_night <= max_price)
+        query = query.filter(models.Hotel.effective_price_per_night <= max_price)
+    
+    # Apply amenities filter before pagination, using the in-memory amenity bitsets
+    if amenities:
+        amenity_names = amenity_index.parse(amenities)
+        if amenity_names:
+            favorite_hotel_ids = [row[0] for row in db.query(models.UserFavoriteHotel.hotel_id).filter(
+                models.UserFavoriteHotel.user_id == current_user.id
+            ).all()]
+            matching_ids = amenity_index.matching(db, amenity_names, amenities_match_all, favorite_hotel_ids)
+            query = query.filter(models.Hotel.id.in_(matching_ids))
     
     favorites = query.offset(skip).limit(limit).all()
     
-    # Apply amenities filter if specified
-    if amenities:
-        amenity_list = [amenity.strip() for amenity in amenities.split(",")]
-        filtered_favorites = []
-        
-        for favorite in favorites:
-            if favorite.hotel.amenities:
-                hotel_amenities = favorite.hotel.amenities if isinstance(favorite.hotel.amenities, list) else []
-                
-                if amenities_match_all:
-                    if all(amenity in hotel_amenities for amenity in amenity_list):
-                        filtered_favorites.append(favorite)
-                else:
-                    if any(amenity in hotel_amenities for amenity in amenity_list):
-                        filtered_favorites.append(favorite)
-        
-        return filtered_favorites
+    # Set owner names for each hotel
+    for favorite in favorites:
+        owner = favorite.hotel.owner
+        favorite.hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
     
     return favorites
 
@@ -138,7 +142,7 @@ def check_if_hotel_is_favorite(
     
     return {"is_favorite": favorite is not None}
 
-@router.get("/hotels", response_model=List[schemas.HotelResponse])
+@router.get("/hotels", response_model=schemas.HotelList)
 def get_favorite_hotels_only(
     skip: int = 0,
     limit: int = 100,
@@ -147,12 +151,20 @@ def get_favorite_hotels_only(
     max_price: Optional[float] = None,
     amenities: Optional[str] = None,
     amenities_match_all: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, or 'summary' for list-card fields"),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     # Get just the hotels that are favorites (without favorite metadata)
+    currency = currency_converter.parse(currency)
+    projection = HotelProjection.parse(fields, include=["currency"] if currency else [])
     query = db.query(models.Hotel).join(
         models.UserFavoriteHotel, models.Hotel.id == models.UserFavoriteHotel.hotel_id
+    ).options(
+        *(projection.options() if projection else [
+            joinedload(models.Hotel.owner).load_only(models.User.full_name, models.User.username)
+        ])
     ).filter(models.UserFavoriteHotel.user_id == current_user.id)
     
     # Apply filters
@@ -160,34 +172,31 @@ def get_favorite_hotels_only(
         query = query.filter(models.Hotel.city.ilike(f"%{city}%"))
     
     if min_price:
-        query = query.filter(models.Hotel.price_per_night >= min_price)
+        query = query.filter(models.Hotel.effective_price_per_night >= min_price)
     
     if max_price:
-        query = query.filter(models.Hotel.price_per_night <= max_price)
+        query = query.filter(models.Hotel.effective_price_per_night <= max_price)
     
-    hotels = query.offset(skip).limit(limit).all()
+    # Apply amenities filter before pagination, using the in-memory amenity bitsets
+    if amenities:
+        amenity_names = amenity_index.parse(amenities)
+        if amenity_names:
+            favorite_hotel_ids = [row[0] for row in db.query(models.UserFavoriteHotel.hotel_id).filter(
+                models.UserFavoriteHotel.user_id == current_user.id
+            ).all()]
+            matching_ids = amenity_index.matching(db, amenity_names, amenities_match_all, favorite_hotel_ids)
+            query = query.filter(models.Hotel.id.in_(matching_ids))
     
-    # Set owner names for each hotel
-    for hotel in hotels:
-        owner = db.query(models.User).filter(models.User.id == hotel.owner_id).first()
-        hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+    hotels = query.offset(skip).limit(limit).all()
     
-    # Apply amenities filter if specified
-    if amenities:
-        amenity_list = [amenity.strip() for amenity in amenities.split(",")]
-        filtered_hotels = []
-        
+    if projection:
+        hotels = projection.dump(hotels)
+    else:
+        # Set owner names for each hotel
         for hotel in hotels:
-            if hotel.amenities:
-                hotel_amenities = hotel.amenities if isinstance(hotel.amenities, list) else []
-                
-                if amenities_match_all:
-                    if all(amenity in hotel_amenities for amenity in amenity_list):
-                        filtered_hotels.append(hotel)
-                else:
-                    if any(amenity in hotel_amenities for amenity in amenity_list):
-                        filtered_hotels.append(hotel)
-        
-        return filtered_hotels
+            owner = hotel.owner
+            hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
     
+    if currency:
+        return currency_converter.convert_hotels(hotels, currency)
     return hotels
\ No newline at end of file
@@ -1,37 +1,225 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
-from pathlib import Path
-import uuid
-import shutil
-import os
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import and_, exists, func, select, update
+from typing import List, Optional, Union
 from database import get_db
 import models
 import schemas
-from auth.auth import get_current_user, get_current_owner
+from auth.auth import get_current_user, get_current_owner, get_optional_user
+from services.search_service import hotel_search
+from services.trigram_service import hotel_trigram_index
+from services.geo_service import hotel_geo_index
+from services.hotel_indexes import hotel_indexes
+from services.geo_engine import geo_engine
+from services.deals_service import deal_ranking
+from services.cache_service import response_cache
+from services.facet_service import hotel_facets
+from services.amenity_service import amenity_index
+from services.autocomplete_service import autocomplete_index
+from services.map_service import hotel_map
+from services.review_service import hotel_reviews
+from services.import_service import hotel_importer
+from services.similarity_service import similar_hotels
+from services.currency_service import currency_converter
+from services.upload_service import image_uploader
+from services.image_service import image_derivatives
+from services.media_service import media_store
+from services.upload_session_service import upload_sessions
+from utils.pagination import keyset_paginate, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from utils.projection import HotelProjection
 
 router = APIRouter()
 
 
-@router.get("/search")
+def _owner_name_only():
+    """Eager-load the owner's display name columns in the same statement as the hotels"""
+    return joinedload(models.Hotel.owner).load_only(models.User.full_name, models.User.username)
+
+
+def _favorites_namespace(kwargs: dict) -> Optional[str]:
+    """Response cache namespace of the signed-in user's favorite flags"""
+    current_user = kwargs.get("current_user")
+    return f"favorites:{current_user.id}" if current_user else None
+
+
+@router.get("/search", response_model=List[schemas.HotelResponse])
 def search_hotels(
     q: str = Query(..., description="Search query"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text hotel search ranked by relevance (BM25 on SQLite).
+    When nothing matches exactly, falls back to trigram similarity on hotel name and city
+    so misspellings ("Barcelna", "Marriot") still find results.
+    """
+    currency = currency_converter.parse(currency)
+    query, rank = hotel_search.filter_query(db, db.query(models.Hotel).options(_owner_name_only()), q)
+    if rank is not None:
+        query = query.order_by(rank, models.Hotel.id)
+    
+    hotels = query.offset(skip).limit(limit).all()
+    
+    # Typo-tolerant fallback
+    if not hotels and (not skip or query.first() is None):
+        query, rank = hotel_trigram_index.filter_query(db, db.query(models.Hotel).options(_owner_name_only()), q)
+        if rank is not None:
+            query = query.order_by(rank, models.Hotel.id)
+        hotels = query.offset(skip).limit(limit).all()
+    
+    # Set owner names
+    for hotel in hotels:
+        owner = hotel.owner
+        hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+    
+    if currency:
+        return currency_converter.convert_hotels(hotels, currency)
+    return hotels
+
+@router.get("/autocomplete", response_model=List[schemas.AutocompleteSuggestion])
+def autocomplete_hotels(
+    q: str = Query(..., min_length=1, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    """
+    Search-box suggestions (hotels, cities, countries) whose name starts with ``q``,
+    served from the in-memory prefix index
+    """
+    return autocomplete_index.suggest(db, q, limit)
+
+@router.get("/map", response_model=schemas.HotelMapResponse)
+def get_hotel_map(
+    bbox: str = Query(..., description="Viewport as min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    db: Session = Depends(get_db)
+):
+    """
+    Hotels in a map viewport, grouped into grid clusters (count, centroid, min price).
+    Individual pins are returned at high zoom levels.
+    """
+    return hotel_map.viewport(db, bbox, zoom)
+
+@router.get("/nearby", response_model=schemas.HotelList)
+def get_nearby_hotels(
+    lat: float = Query(..., description="User's latitude"),
+    lon: float = Query(..., description="User's longitude"), 
+    radius_km: float = Query(10.0, description="Search radius in kilometers"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, or 'summary' for list-card fields"),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
+    response: Response = None,
     db: Session = Depends(get_db)
 ):
-    hotels = db.query(models.Hotel).filter(
-        or_(
-            models.Hotel.name.ilike(f"%{q}%"),
-            models.Hotel.city.ilike(f"%{q}%"),
-            models.Hotel.country.ilike(f"%{q}%"),
-            models.Hotel.description.ilike(f"%{q}%")
+    """
+    Get hotels near a given location, nearest first.
+    Candidates come from the spatial index; distance filtering, ordering and the page limit run in SQL.
+    """
+    currency = currency_converter.parse(currency)
+    projection = HotelProjection.parse(fields, include=["currency"] if currency else [])
+    sort_key = f"nearby:{lat}:{lon}:{radius_km}"
+    
+    if geo_engine.enabled:
+        # In-memory vectorized lookup, no database work until the page is hydrated
+        geo_engine.ensure_loaded(db)
+        after = tuple(decode_cursor(cursor, sort_key)) if cursor else None
+        rows = geo_engine.nearby(lat, lon, radius_km, limit + 1, 0 if cursor else skip, after)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort_key, [rows[-1][1], rows[-1][0]])
+        distances = dict(rows)
+    else:
+        candidates, hotel_id_col, distance = hotel_geo_index.within_radius(db, lat, lon, radius_km)
+        order = [(distance, False), (hotel_id_col, False)]
+        rows, next_cursor = keyset_paginate(
+            candidates, order, sort_key, cursor, limit, skip,
+            row_values=lambda row: [row.distance_km, row.hotel_id]
         )
-    ).all()
+        distances = {row.hotel_id: row.distance_km for row in rows}
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Load only the hotels on this page
+    query = db.query(models.Hotel)
+    if projection:
+        query = query.options(*projection.options())
+    hotels = query.filter(models.Hotel.id.in_(distances.keys())).all() if distances else []
+    for hotel in hotels:
+        hotel.distance_km = round(distances[hotel.id], 2)
+    hotels.sort(key=lambda hotel: (distances[hotel.id], hotel.id))
+    
+    if projection:
+        hotels = projection.dump(hotels)
+    if currency:
+        return currency_converter.convert_hotels(hotels, currency)
     return hotels
 
-@router.get("/", response_model=List[schemas.HotelResponse])
+@router.get("/deals", response_model=schemas.HotelList)
+@response_cache.cached("hotels", response_model=schemas.HotelList, vary=currency_converter.cache_validator)
+def get_hotel_deals(
+    request: Request,
+    max_price: Optional[float] = Query(None, description="Maximum price filter"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, or 'summary' for list-card fields"),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
+    response: Response = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get hotels with good deals - prioritize discounted hotels and good ratings
+    """
+    currency = currency_converter.parse(currency)
+    projection = HotelProjection.parse(fields, include=["currency"] if currency else [])
+    query = db.query(models.Hotel)
+    
+    # Filter by available rooms
+    query = query.filter(models.Hotel.available_rooms > 0)
+    
+    # Filter by maximum price (discount price for deals, otherwise the nightly price)
+    if max_price:
+        query = query.filter(models.Hotel.effective_price_per_night <= max_price)
+    
+    # Prioritize deals and good ratings
+    query = query.filter(
+        and_(
+            models.Hotel.rating >= 3.5,  # Lower threshold to show more options
+            models.Hotel.effective_price_per_night.isnot(None)
+        )
+    )
+    # deal_score ranks deals first, then by discount percentage, then by rating
+    # (see services/deals_service.py), so pages stream from idx_hotels_deal_rank
+    order = [
+        (models.Hotel.deal_score, True),
+        (models.Hotel.effective_price_per_night, False),  # Lower prices first
+        (models.Hotel.id, False)
+    ]
+    if projection:
+        query = query.options(*projection.options(*[col for col, _ in order]))
+    deals, next_cursor = keyset_paginate(query, order, "deals:ranked", cursor, limit, skip)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    if projection:
+        deals = projection.dump(deals)
+    if currency:
+        return currency_converter.convert_hotels(deals, currency)
+    return deals
+
+
+@router.get("/", response_model=Union[schemas.HotelList, schemas.HotelListResponse])
+@response_cache.cached("hotels", response_model=Union[schemas.HotelList, schemas.HotelListResponse], vary=currency_converter.cache_validator)
 def get_hotels(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     city: Optional[str] = None,
@@ -39,22 +227,34 @@ def get_hotels(
     max_price: Optional[float] = None,
     min_rating: Optional[float] = None,
     search: Optional[str] = None,
+    amenities: Optional[str] = Query(None, description="Comma-separated amenity names"),
+    amenities_match_all: bool = False,
     sort_by: Optional[str] = None,  # 'name', 'rating', 'price', 'city'
     sort_desc: bool = False,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    facets: Optional[str] = Query(None, description="Comma-separated facets to count: city, star_rating, price, deal, amenity"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, or 'summary' for list-card fields"),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
+    response: Response = None,
     db: Session = Depends(get_db)
 ):
+    """
+    List hotels. Pages are keyset-paginated: pass the X-Next-Cursor response header
+    back as ``cursor`` to fetch the next page (``skip`` is still accepted for the first page).
+
+    With ``facets`` the response becomes ``{"hotels": [...], "total": n, "facets": {...}}``,
+    where the counts cover every hotel matching the filters, not just the page.
+    With ``fields`` each hotel only carries the requested fields.
+    """
+    facet_names = hotel_facets.parse(facets) if facets else None
+    currency = currency_converter.parse(currency)
+    projection = HotelProjection.parse(fields, include=["currency"] if currency else [])
     query = db.query(models.Hotel)
+    search_rank = None
     
     # Search filter
     if search:
-        query = query.filter(
-            or_(
-                models.Hotel.name.ilike(f"%{search}%"),
-                models.Hotel.city.ilike(f"%{search}%"),
-                models.Hotel.country.ilike(f"%{search}%"),
-                models.Hotel.description.ilike(f"%{search}%")
-            )
-        )
+        query, search_rank = hotel_search.filter_query(db, query, search)
     
     # City filter
     if city:
@@ -62,14 +262,20 @@ def get_hotels(
         
     # Price range filter
     if min_price:
-        query = query.filter(models.Hotel.price_per_night >= min_price)
+        query = query.filter(models.Hotel.effective_price_per_night >= min_price)
     if max_price:
-        query = query.filter(models.Hotel.price_per_night <= max_price)
+        query = query.filter(models.Hotel.effective_price_per_night <= max_price)
         
     # Rating filter
     if min_rating:
         query = query.filter(models.Hotel.rating >= min_rating)
     
+    # Amenities filter (match any by default, all with amenities_match_all)
+    if amenities:
+        amenity_names = amenity_index.parse(amenities)
+        if amenity_names:
+            query = amenity_index.filter_query(query, amenity_names, amenities_match_all)
+    
     # Sorting
     if sort_by:
         if sort_by.lower() == 'name':
@@ -77,31 +283,50 @@ def get_hotels(
         elif sort_by.lower() == 'rating':
             order_col = models.Hotel.rating
         elif sort_by.lower() == 'price':
-            order_col = models.Hotel.price_per_night
+            order_col = models.Hotel.effective_price_per_night
         elif sort_by.lower() == 'city':
             order_col = models.Hotel.city
         else:
             order_col = models.Hotel.name
-            
-        if sort_desc:
-            query = query.order_by(order_col.desc())
-        else:
-            query = query.order_by(order_col.asc())
+        order = [(order_col, sort_desc), (models.Hotel.id, sort_desc)]
     else:
-        query = query.order_by(models.Hotel.created_at.desc())  # Default sort by newest
-        
-    hotels = query.offset(skip).limit(limit).all()
+        order = [(models.Hotel.created_at, True), (models.Hotel.id, True)]  # Default sort by newest
     
-    # Set owner names
-    for hotel in hotels:
-        owner = db.query(models.User).filter(models.User.id == hotel.owner_id).first()
-        hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
-        
+    # Facet counts over the filtered set, before pagination
+    if facet_names:
+        total, facet_counts = hotel_facets.count(query, facet_names)
+    
+    if projection:
+        page_query = query.options(*projection.options(*[col for col, _ in order]))
+    else:
+        page_query = query.options(_owner_name_only())
+    if search_rank is not None and not sort_by:
+        # Relevance has no stable key to seek on, so ranked search results page by offset
+        hotels = page_query.order_by(search_rank, models.Hotel.id).offset(skip).limit(limit).all()
+    else:
+        sort_key = f"hotels:{order_col.key if sort_by else 'created_at'}:{sort_desc if sort_by else True}"
+        hotels, next_cursor = keyset_paginate(page_query, order, sort_key, cursor, limit, skip)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    if projection:
+        hotels = projection.dump(hotels)
+    else:
+        # Set owner names
+        for hotel in hotels:
+            owner = hotel.owner
+            hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+    if currency:
+        hotels = currency_converter.convert_hotels(hotels, currency)
+    
+    if facet_names:
+        return {"hotels": hotels, "total": total, "facets": facet_counts}
     return hotels
 
 @router.get("/{hotel_id}", response_model=schemas.HotelResponse)
-def get_hotel(hotel_id: str, db: Session = Depends(get_db)):
-    hotel = db.query(models.Hotel).filter(models.Hotel.id == hotel_id).first()
+@response_cache.cached("hotel:{hotel_id}", "users", response_model=schemas.HotelResponse)
+def get_hotel(hotel_id: str, request: Request, db: Session = Depends(get_db)):
+    hotel = db.query(models.Hotel).options(_owner_name_only()).filter(models.Hotel.id == hotel_id).first()
     if not hotel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,11 +334,110 @@ def get_hotel(hotel_id: str, db: Session = Depends(get_db)):
         )
     
     # Set owner name
-    owner = db.query(models.User).filter(models.User.id == hotel.owner_id).first()
+    owner = hotel.owner
     hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
     
     return hotel
 
+@router.get("/{hotel_id}/detail", response_model=schemas.HotelDetailResponse)
+@response_cache.cached(
+    "hotel:{hotel_id}", "reviews:{hotel_id}", "users", _favorites_namespace,
+    response_model=schemas.HotelDetailResponse
+)
+def get_hotel_detail(
+    hotel_id: str,
+    request: Request,
+    review_limit: int = Query(5, ge=1, le=50, description="Number of reviews in the first page"),
+    current_user: Optional[models.User] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Everything the hotel detail screen needs in one round trip: the hotel, its active
+    room types, the first page of reviews with the rating summary and, for signed-in
+    users, whether the hotel is a favorite.
+    """
+    query = db.query(models.Hotel).options(_owner_name_only()).filter(models.Hotel.id == hotel_id)
+    if current_user:
+        is_favorite = exists().where(
+            and_(
+                models.UserFavoriteHotel.user_id == current_user.id,
+                models.UserFavoriteHotel.hotel_id == models.Hotel.id
+            )
+        )
+        row = query.add_columns(is_favorite).first()
+        hotel, favorite = row if row else (None, False)
+    else:
+        hotel, favorite = query.first(), False
+    
+    if not hotel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hotel not found"
+        )
+    
+    # Set owner name
+    owner = hotel.owner
+    hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+    
+    room_types = db.query(models.RoomType).filter(
+        models.RoomType.hotel_id == hotel_id,
+        models.RoomType.is_active == True
+    ).order_by(models.RoomType.base_price).all()
+    
+    reviews = hotel_reviews.page_query(db, hotel_id).limit(review_limit).all()
+    summary = hotel_reviews.summary(db, hotel_id)
+    
+    return {
+        "hotel": hotel,
+        "room_types": room_types,
+        "reviews": {
+            "reviews": hotel_reviews.format(reviews),
+            "pagination": hotel_reviews.pagination(1, review_limit, summary["total_reviews"]),
+            "summary": summary
+        },
+        "is_favorite": bool(favorite)
+    }
+
+@router.get("/{hotel_id}/similar", response_model=schemas.HotelList)
+@response_cache.cached("hotels", "hotel:{hotel_id}", "similar", response_model=schemas.HotelList, vary=currency_converter.cache_validator)
+def get_similar_hotels(
+    hotel_id: str,
+    request: Request,
+    limit: int = Query(10, ge=1, le=50, description="Number of similar hotels"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, or 'summary' for list-card fields"),
+    currency: Optional[str] = Query(None, description="Render prices in this currency (e.g. EUR)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Hotels similar in price, ratings, amenities, property type and location,
+    from the precomputed neighbours (see services/similarity_service.py)
+    """
+    currency = currency_converter.parse(currency)
+    projection = HotelProjection.parse(fields, include=["currency"] if currency else [])
+    options = projection.options() if projection else [_owner_name_only()]
+    
+    hotels = similar_hotels.similar_query(db, hotel_id).options(*options).limit(limit).all()
+    if not hotels:
+        hotel = db.query(models.Hotel).options(load_only(models.Hotel.city)).filter(models.Hotel.id == hotel_id).first()
+        if not hotel:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Hotel not found"
+            )
+        hotels = similar_hotels.fallback_query(db, hotel).options(*options).limit(limit).all()
+    
+    if projection:
+        hotels = projection.dump(hotels)
+    else:
+        # Set owner names
+        for hotel in hotels:
+            owner = hotel.owner
+            hotel.owner_name = owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+    
+    if currency:
+        return currency_converter.convert_hotels(hotels, currency)
+    return hotels
+
 @router.post("/", response_model=schemas.HotelResponse)
 def create_hotel(
     hotel: schemas.HotelCreate,
@@ -133,6 +457,8 @@ def create_hotel(
         available_rooms=hotel.total_rooms
     )
     db.add(db_hotel)
+    db.flush()
+    hotel_indexes.sync(db, db_hotel)
     db.commit()
     db.refresh(db_hotel)
     return db_hotel
@@ -165,6 +491,8 @@ def update_hotel(
     for field, value in update_data.items():
         setattr(hotel, field, value)
     
+    db.flush()
+    hotel_indexes.sync(db, hotel)
     db.commit()
     db.refresh(hotel)
     return hotel
@@ -185,6 +513,7 @@ def delete_hotel(
             detail="Hotel not found"
         )
     
+    hotel_indexes.remove(db, hotel.id)
     db.delete(hotel)
     db.commit()
     return {"message": "Hotel deleted successfully"}
@@ -201,6 +530,8 @@ def get_owner_hotels(
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     min_rating: Optional[float] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    response: Response = None,
     current_user: models.User = Depends(get_current_owner),
     db: Session = Depends(get_db)
 ):
@@ -208,17 +539,11 @@ def get_owner_hotels(
     
     try:
         query = db.query(models.Hotel).filter(models.Hotel.owner_id == current_user.id)
+        search_rank = None
         
         # Search filter
         if search:
-            query = query.filter(
-                or_(
-                    models.Hotel.name.ilike(f"%{search}%"),
-                    models.Hotel.city.ilike(f"%{search}%"),
-                    models.Hotel.country.ilike(f"%{search}%"),
-                    models.Hotel.description.ilike(f"%{search}%")
-                )
-            )
+            query, search_rank = hotel_search.filter_query(db, query, search)
         
         # City filter
         if city:
@@ -226,9 +551,9 @@ def get_owner_hotels(
             
         # Price range filter
         if min_price:
-            query = query.filter(models.Hotel.price_per_night >= min_price)
+            query = query.filter(models.Hotel.effective_price_per_night >= min_price)
         if max_price:
-            query = query.filter(models.Hotel.price_per_night <= max_price)
+            query = query.filter(models.Hotel.effective_price_per_night <= max_price)
             
         # Rating filter
         if min_rating:
@@ -253,20 +578,23 @@ def get_owner_hotels(
             elif sort_by.lower() == 'rooms':
                 order_col = models.Hotel.available_rooms
             elif sort_by.lower() == 'price':
-                order_col = models.Hotel.price_per_night
+                order_col = models.Hotel.effective_price_per_night
             elif sort_by.lower() == 'date':
                 order_col = models.Hotel.created_at
             else:
                 order_col = models.Hotel.name
-                
-            if sort_desc:
-                query = query.order_by(order_col.desc())
-            else:
-                query = query.order_by(order_col.asc())
+            order = [(order_col, sort_desc), (models.Hotel.id, sort_desc)]
         else:
-            query = query.order_by(models.Hotel.created_at.desc())  # Default sort by newest
-            
-        hotels = query.offset(skip).limit(limit).all()
+            order = [(models.Hotel.created_at, True), (models.Hotel.id, True)]  # Default sort by newest
+        
+        if search_rank is not None and not sort_by:
+            # Relevance has no stable key to seek on, so ranked search results page by offset
+            hotels = query.order_by(search_rank, models.Hotel.id).offset(skip).limit(limit).all()
+        else:
+            sort_key = f"owner-hotels:{order_col.key if sort_by else 'created_at'}:{sort_desc if sort_by else True}"
+            hotels, next_cursor = keyset_paginate(query, order, sort_key, cursor, limit, skip)
+            if next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         # Set owner names
         for hotel in hotels:
@@ -274,56 +602,61 @@ def get_owner_hotels(
             
         return hotels
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_owner_hotels: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve hotels")
 
+@router.post("/bulk", response_model=schemas.HotelImportReport)
+def bulk_import_hotels(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="ndjson or csv (detected from the file name or content type if omitted)"),
+    current_user: models.User = Depends(get_current_owner),
+    db: Session = Depends(get_db)
+):
+    """
+    Import hotels from an NDJSON or CSV file, one HotelCreate per line/record.
+    CSV list columns (amenities, images) take "a|b" or a JSON array.
+    Valid rows are inserted in batches; invalid rows are reported by line number.
+    """
+    fmt = hotel_importer.detect_format(file.filename, file.content_type, format)
+    return hotel_importer.run(db, current_user.id, file.file, fmt)
+
 @router.post("/upload-image")
 async def upload_hotel_image(
     file: UploadFile = File(...),
     current_user: models.User = Depends(get_current_owner)
 ):
-    # Validate file type
-    if not file.content_type or not file.content_type.startswith('image/'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image"
-        )
-    
-    # Create uploads directory if it doesn't exist
-    upload_dir = Path("uploads/hotels")
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1] if file.filename else '.jpg'
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = upload_dir / unique_filename
-    
-    # Save file
+    # Stream the file into the media store off the event loop, checking its type and size as it is written
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_path = await image_uploader.save(file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save file: {str(e)}"
         )
+    # Resized WebP/JPEG copies are generated in the background (once per stored file)
+    image_url = media_store.url_for(file_path)
+    if image_derivatives.manifest(image_url) is None:
+        image_derivatives.submit(file_path)
     
     # Return the URL for the uploaded image
-    image_url = f"/uploads/hotels/{unique_filename}"
-    return {"image_url": image_url, "filename": unique_filename}
+    return {"image_url": image_url, "filename": file_path.name, "sha256": file_path.stem}
 
 @router.post("/upload-images")
 async def upload_hotel_images(
     files: List[UploadFile] = File(...),
-    hotel_name: str = Form(None),
+    hotel_name: str = Form(None),  # Accepted for older clients; stored files are named by content
     current_user: models.User = Depends(get_current_owner)
 ):
     # Strict limit enforcement
-    if len(files) > 10:
+    if len(files) > image_uploader.max_files:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 10 images allowed per upload. Please select fewer images."
+            detail=f"Maximum {image_uploader.max_files} images allowed per upload. Please select fewer images."
         )
     
     if len(files) == 0:
@@ -332,167 +665,136 @@ async def upload_hotel_images(
             detail="At least one image is required"
         )
     
-    from datetime import datetime
-    import re
-    
-    
-    # Create new directory structure: uploads/hotels/owner_name_hotel/DD-MM-YYYY/name_hotel_uuid/
-    # Clean owner name for directory (replace @ and . with _)
-    owner_name_clean = re.sub(r'[^\w\-_]', '_', current_user.full_name or current_user.email.split('@')[0])
-    
-    # Clean hotel name for directory structure
-    hotel_name_clean = re.sub(r'[^\w\-_]', '_', hotel_name) if hotel_name else "unnamed_hotel"
-    
-    # Create date folder in DD-MM-YYYY format
-    current_date = datetime.now().strftime("%d-%m-%Y")
-    
-    # Generate unique folder name with hotel name and UUID
-    import uuid
-    hotel_uuid = str(uuid.uuid4())[:8]  # Use first 8 characters of UUID
-    folder_name = f"{hotel_name_clean}_{hotel_uuid}"
-    
-    # Create the full directory structure
-    upload_dir = Path(f"uploads/hotels/{owner_name_clean}/{current_date}/{folder_name}")
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    # Write all files concurrently into the media store, off the event loop
+    results = await image_uploader.save_many(files)
     
     uploaded_images = []
-    
-    for i, file in enumerate(files):
-        
-        # Validate file type - check both content type and file extension
-        is_image_by_content_type = file.content_type and file.content_type.startswith('image/')
-        is_image_by_extension = False
-        file_ext_check = None
-        if file.filename:
-            file_ext_check = os.path.splitext(file.filename)[1].lower()
-            is_image_by_extension = file_ext_check in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
-        
-        if not (is_image_by_content_type or is_image_by_extension):
-            continue  # Skip non-image files
-        
-        # Generate filename with simple structure
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.jpg'
-        unique_filename = f"image_{i+1}{file_extension}"
-        file_path = upload_dir / unique_filename
-        
-        # Save file
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            image_url = f"/uploads/hotels/{owner_name_clean}/{current_date}/{folder_name}/{unique_filename}"
-            uploaded_images.append({
-                "image_url": image_url,
-                "filename": unique_filename,
-                "original_filename": file.filename
-            })
-        except Exception as e:
+    rejected_images = []
+    for file, result in zip(files, results):
+        if isinstance(result, HTTPException):
+            rejected_images.append({"original_filename": file.filename, "detail": result.detail})
+            continue  # Skip files that are not allowed images
+        if isinstance(result, Exception):
             continue  # Skip files that fail to upload
-    
-    return {"uploaded_images": uploaded_images}
+        
+        image_url = media_store.url_for(result)
+        if image_derivatives.manifest(image_url) is None:
+            image_derivatives.submit(result)
+        uploaded_images.append({
+            "image_url": image_url,
+            "filename": result.name,
+            "sha256": result.stem,
+            "original_filename": file.filename
+        })
+    
+    return {"uploaded_images": uploaded_images, "rejected_images": rejected_images}
 
-@router.get("/nearby", response_model=List[schemas.HotelResponse])
-def get_nearby_hotels(
-    lat: float = Query(..., description="User's latitude"),
-    lon: float = Query(..., description="User's longitude"), 
-    radius_km: float = Query(10.0, description="Search radius in kilometers"),
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+@router.post("/upload-sessions", response_model=schemas.UploadSessionResponse)
+def create_upload_session(
+    upload: schemas.UploadSessionCreate,
+    current_user: models.User = Depends(get_current_owner)
 ):
     """
-    Get hotels near a given location using Haversine formula
+    Start a resumable upload of one image: PUT its bytes in chunks to
+    /upload-sessions/{upload_id}?offset=N, then POST .../finalize with its SHA-256.
     """
-    import math
-    
-    # Convert radius from km to degrees (approximation)
-    # 1 degree ≈ 111 km
-    radius_deg = radius_km / 111.0
-    
-    # Query hotels within bounding box first (for performance)
-    hotels = db.query(models.Hotel).filter(
-        and_(
-            models.Hotel.latitude.between(lat - radius_deg, lat + radius_deg),
-            models.Hotel.longitude.between(lon - radius_deg, lon + radius_deg)
-        )
-    ).all()
-    
-    # Filter by actual distance using Haversine formula
-    nearby_hotels = []
-    for hotel in hotels:
-        if hotel.latitude and hotel.longitude:
-            distance = _calculate_distance(lat, lon, hotel.latitude, hotel.longitude)
-            if distance <= radius_km:
-                hotel.distance_km = round(distance, 2)
-                nearby_hotels.append(hotel)
+    return upload_sessions.create(current_user.id, upload.size, upload.filename)
+
+@router.get("/upload-sessions/{upload_id}", response_model=schemas.UploadSessionResponse)
+def get_upload_session(
+    upload_id: str,
+    current_user: models.User = Depends(get_current_owner)
+):
+    # The offset tells a client where to resume after a dropped connection
+    return upload_sessions.status(upload_sessions.get(upload_id, current_user.id))
+
+@router.put("/upload-sessions/{upload_id}", response_model=schemas.UploadSessionResponse)
+async def upload_session_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Position of this chunk in the file (bytes received so far)"),
+    current_user: models.User = Depends(get_current_owner)
+):
+    # The request body is the raw chunk, streamed to disk as it arrives
+    session = upload_sessions.get(upload_id, current_user.id)
+    return await upload_sessions.append(session, offset, request.stream())
+
+@router.post("/upload-sessions/{upload_id}/finalize")
+async def finalize_upload_session(
+    upload_id: str,
+    body: schemas.UploadSessionFinalize,
+    current_user: models.User = Depends(get_current_owner)
+):
+    session = upload_sessions.get(upload_id, current_user.id)
+    file_path = await run_in_threadpool(upload_sessions.finalize, session, body.sha256)
     
-    # Sort by distance
-    nearby_hotels.sort(key=lambda x: getattr(x, 'distance_km', float('inf')))
+    image_url = media_store.url_for(file_path)
+    if image_derivatives.manifest(image_url) is None:
+        image_derivatives.submit(file_path)
     
-    # Apply pagination
-    return nearby_hotels[skip:skip + limit]
+    # Same response as /upload-image
+    return {"image_url": image_url, "filename": file_path.name, "sha256": file_path.stem}
 
-@router.get("/deals", response_model=List[schemas.HotelResponse])
-def get_hotel_deals(
-    max_price: Optional[float] = Query(None, description="Maximum price filter"),
-    skip: int = 0,
-    limit: int = 100,
+@router.delete("/upload-sessions/{upload_id}")
+def abort_upload_session(
+    upload_id: str,
+    current_user: models.User = Depends(get_current_owner)
+):
+    upload_sessions.abort(upload_sessions.get(upload_id, current_user.id))
+    return {"message": "Upload session deleted"}
+
+@router.patch("/owner/discount")
+def bulk_update_hotel_discount(
+    discount: schemas.BulkDiscountUpdate,
+    current_user: models.User = Depends(get_current_owner),
     db: Session = Depends(get_db)
 ):
     """
-    Get hotels with good deals - prioritize discounted hotels and good ratings
+    Apply a discount to a set of the current owner's hotels (by ids, city, or all of them)
+    with one UPDATE that recomputes discount prices and the deals ranking in SQL
     """
-    query = db.query(models.Hotel)
-    
-    # Filter by available rooms
-    query = query.filter(models.Hotel.available_rooms > 0)
-    
-    # Filter by maximum price (consider both original and discount price)
-    if max_price:
-        query = query.filter(
-            or_(
-                and_(models.Hotel.is_deal == True, models.Hotel.discount_price <= max_price),
-                and_(models.Hotel.is_deal != True, models.Hotel.price_per_night <= max_price)
-            )
-        )
-    
-    # Prioritize deals and good ratings
-    # Order by: deals first (is_deal), then by discount percentage (desc), then by rating (desc)
-    deals = query.filter(
-        and_(
-            models.Hotel.rating >= 3.5,  # Lower threshold to show more options
-            models.Hotel.price_per_night.isnot(None)
+    if not discount.hotel_ids and not discount.city and not discount.all_hotels:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select hotels with hotel_ids or city, or set all_hotels"
         )
-    ).order_by(
-        models.Hotel.is_deal.desc(),  # Deals first
-        models.Hotel.discount_percentage.desc(),  # Higher discounts first
-        models.Hotel.rating.desc(),  # Better ratings first
-        models.Hotel.price_per_night.asc()  # Lower prices first
-    ).offset(skip).limit(limit).all()
-    
-    return deals
-
-def _calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees) using Haversine formula
-    Returns distance in kilometers
-    """
-    import math
     
-    # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    hotels = models.Hotel.__table__
+    is_deal = discount.discount_percentage > 0
+    pricing = {
+        "discount_percentage": discount.discount_percentage,
+        "discount_price": deal_ranking.discount_price_sql(discount.discount_percentage, hotels),
+        "is_deal": is_deal,
+    }
+    conditions = [hotels.c.owner_id == current_user.id]
+    if discount.hotel_ids:
+        conditions.append(hotels.c.id.in_(discount.hotel_ids))
+    if discount.city:
+        conditions.append(func.lower(hotels.c.city) == discount.city.strip().lower())
+    statement = update(hotels).where(*conditions).values(
+        **pricing,
+        **deal_ranking.ranking_values(hotels, **pricing)
+    )
     
-    # Radius of earth in kilometers
-    r = 6371
+    try:
+        hotel_ids = db.execute(select(hotels.c.id).where(*conditions)).scalars().all()
+        result = db.execute(statement)
+        # Core updates bypass the ORM flush hooks, so invalidate cached listings and hotel pages explicitly
+        response_cache.invalidate(db, "hotels", *(f"hotel:{hotel_id}" for hotel_id in hotel_ids))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update hotel discounts: {str(e)}"
+        )
     
-    return c * r
+    return {
+        "message": "Hotel discounts updated successfully",
+        "updated_hotels": result.rowcount,
+        "discount_percentage": discount.discount_percentage,
+        "is_deal": is_deal
+    }
 
 @router.patch("/owner/{hotel_id}/discount")
 def update_hotel_discount(
@@ -11,6 +11,7 @@ import schemas
 from auth.auth import get_current_user
 from services.stripe_service import stripe_service
 from services.qr_service import qr_service
+from services.currency_service import currency_converter
 import os
 
 router = APIRouter()
@@ -294,6 +295,7 @@ def confirm_payment_link_success(
                 booking_id=booking.id,
                 amount=session.amount_total / 100,  # Convert from cents
                 currency=session.currency,
+                exchange_rate=currency_converter.exchange_rate(booking.currency, session.currency),
                 status=models.PaymentStatus.PAID,
                 transaction_id=session_id,
                 payment_provider="stripe",
@@ -393,6 +395,7 @@ def confirm_booking_payment(
                 booking_id=booking.id,
                 amount=payment_intent['amount'] / 100,  # Convert back from cents
                 currency=payment_intent['currency'],
+                exchange_rate=currency_converter.exchange_rate(booking.currency, payment_intent['currency']),
                 status=models.PaymentStatus.PAID,
                 transaction_id=payment_intent_id,
                 payment_provider="stripe",
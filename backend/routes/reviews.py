@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func, desc, asc
 from typing import List, Optional
@@ -6,12 +6,16 @@ from database import get_db
 import models
 import schemas
 from auth.auth import get_current_user, get_current_owner
+from services.cache_service import response_cache
+from services.review_service import hotel_reviews
 
 router = APIRouter()
 
 @router.get("/hotel/{hotel_id}")
+@response_cache.cached("reviews:{hotel_id}", "users")
 def get_hotel_reviews(
     hotel_id: str,
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(5, ge=1, le=50, description="Number of reviews per page"),
     sort_by: str = Query("newest", description="Sort by: newest, oldest, rating_high, rating_low"),
@@ -28,27 +32,7 @@ def get_hotel_reviews(
             detail="Hotel not found"
         )
     
-    # Base query with eager loading
-    query = db.query(models.Review).options(
-        joinedload(models.Review.user),
-        joinedload(models.Review.booking)
-    ).filter(models.Review.hotel_id == hotel_id)
-    
-    # Apply rating filter
-    if rating_filter is not None:
-        query = query.filter(models.Review.rating == rating_filter)
-    
-    # Apply sorting
-    if sort_by == "newest":
-        query = query.order_by(desc(models.Review.created_at))
-    elif sort_by == "oldest":
-        query = query.order_by(asc(models.Review.created_at))
-    elif sort_by == "rating_high":
-        query = query.order_by(desc(models.Review.rating), desc(models.Review.created_at))
-    elif sort_by == "rating_low":
-        query = query.order_by(asc(models.Review.rating), desc(models.Review.created_at))
-    else:
-        query = query.order_by(desc(models.Review.created_at))
+    query = hotel_reviews.page_query(db, hotel_id, sort_by, rating_filter)
     
     # Get total count for pagination
     total_reviews = query.count()
@@ -58,51 +42,13 @@ def get_hotel_reviews(
     reviews = query.offset(offset).limit(limit).all()
     
     # Get rating summary
-    rating_summary = db.query(
-        models.Review.rating,
-        func.count(models.Review.id).label('count')
-    ).filter(models.Review.hotel_id == hotel_id).group_by(models.Review.rating).all()
-    
-    rating_distribution = {i: 0 for i in range(1, 6)}
-    for rating, count in rating_summary:
-        rating_distribution[rating] = count
-    
-    average_rating = db.query(func.avg(models.Review.rating)).filter(
-        models.Review.hotel_id == hotel_id
-    ).scalar() or 0.0
-    
-    # Format reviews response
-    formatted_reviews = []
-    for review in reviews:
-        formatted_reviews.append({
-            "id": review.id,
-            "rating": review.rating,
-            "comment": review.comment,
-            "owner_reply": review.owner_reply,
-            "created_at": review.created_at.isoformat(),
-            "user": {
-                "id": review.user.id,
-                "full_name": review.user.full_name,
-                "profile_image": review.user.profile_image
-            },
-            "booking_id": review.booking_id
-        })
+    summary = hotel_reviews.summary(db, hotel_id)
+    summary["total_reviews"] = total_reviews
     
     return {
-        "reviews": formatted_reviews,
-        "pagination": {
-            "current_page": page,
-            "total_pages": (total_reviews + limit - 1) // limit,
-            "total_reviews": total_reviews,
-            "limit": limit,
-            "has_next": page * limit < total_reviews,
-            "has_prev": page > 1
-        },
-        "summary": {
-            "average_rating": round(float(average_rating), 1),
-            "total_reviews": total_reviews,
-            "rating_distribution": rating_distribution
-        }
+        "reviews": hotel_reviews.format(reviews),
+        "pagination": hotel_reviews.pagination(page, limit, total_reviews),
+        "summary": summary
     }
 
 @router.post("/", response_model=schemas.ReviewResponse)
@@ -298,7 +244,7 @@ def get_user_reviews(
             "hotel": {
                 "id": review.booking.hotel.id,
                 "name": review.booking.hotel.name,
-                "location": review.booking.hotel.location,
+                "location": f"{review.booking.hotel.city}, {review.booking.hotel.country}",
                 "image_url": review.booking.hotel.images[0] if review.booking.hotel.images else None
             },
             "booking_id": review.booking_id
@@ -388,7 +334,7 @@ def get_owner_reviews(
             "hotel": {
                 "id": review.hotel.id,
                 "name": review.hotel.name,
-                "location": review.hotel.location
+                "location": f"{review.hotel.city}, {review.hotel.country}"
             },
             "user": {
                 "id": review.user.id,
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from models import UserRole, BookingStatus
 
@@ -86,6 +86,9 @@ class HotelResponse(HotelBase):
     available_rooms: int
     owner_id: str
     owner_name: Optional[str] = None
+    distance_km: Optional[float] = None
+    currency: Optional[str] = None  # Currency of the prices
+    image_variants: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None  # image URL -> size -> {width, height, webp, jpeg}
     created_at: datetime
     
     @property
@@ -99,6 +102,119 @@ class HotelResponse(HotelBase):
     class Config:
         from_attributes = True
 
+class HotelSummary(BaseModel):
+    """Fields returned for ``fields=summary`` on hotel list endpoints (list cards)"""
+    id: str
+    name: str
+    city: str
+    country: str
+    price_per_night: float
+    discount_percentage: Optional[float] = 0.0
+    discount_price: Optional[float] = None
+    is_deal: Optional[bool] = False
+    rating: float
+    main_image: Optional[str] = None
+    main_image_variants: Optional[Dict[str, Dict[str, Any]]] = None  # size -> {width, height, webp, jpeg}
+    distance_km: Optional[float] = None
+    currency: Optional[str] = None
+
+# Hotel list bodies: full HotelResponse items, or dicts restricted to the requested ``fields``
+HotelList = Union[List[HotelResponse], List[Dict[str, Any]]]
+
+class HotelListResponse(BaseModel):
+    """Hotel page plus facet counts over the whole filtered set (GET /api/hotels/?facets=...)"""
+    hotels: HotelList
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+class AutocompleteSuggestion(BaseModel):
+    type: str  # "hotel", "city" or "country"
+    text: str
+    subtitle: Optional[str] = None
+    hotel_id: Optional[str] = None
+
+class MapCluster(BaseModel):
+    latitude: float  # Centroid of the hotels in the cell
+    longitude: float
+    count: int
+    min_price: Optional[float] = None
+    hotel_id: Optional[str] = None  # Set when the cluster holds a single hotel
+
+class MapPin(BaseModel):
+    hotel_id: str
+    name: str
+    latitude: float
+    longitude: float
+    price: Optional[float] = None
+    rating: Optional[float] = None
+    is_deal: bool = False
+
+class HotelMapResponse(BaseModel):
+    zoom: int
+    cell_size: Optional[float] = None  # Grid cell edge in degrees (clusters only)
+    total: int
+    clusters: List[MapCluster]
+    pins: List[MapPin]
+
+class RoomTypeResponse(BaseModel):
+    id: str
+    hotel_id: str
+    name: str
+    type: str
+    description: Optional[str] = None
+    max_guests: int
+    max_adults: int
+    max_children: Optional[int] = 0
+    size_sqm: Optional[int] = None
+    bed_type: Optional[str] = None
+    bed_count: Optional[int] = 1
+    base_price: float
+    weekend_price: Optional[float] = None
+    holiday_price: Optional[float] = None
+    total_rooms: Optional[int] = None
+    amenities: Optional[List[str]] = []
+    images: Optional[List[str]] = []
+    
+    class Config:
+        from_attributes = True
+
+class HotelDetailResponse(BaseModel):
+    hotel: HotelResponse
+    room_types: List[RoomTypeResponse]
+    reviews: Dict[str, Any]  # Same shape as GET /api/reviews/hotel/{hotel_id}
+    is_favorite: bool = False
+
+class HotelImportError(BaseModel):
+    row: int  # Line number in the uploaded file
+    errors: List[str]
+
+class HotelImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[HotelImportError]  # Capped at the first 1000 failed rows
+
+class BulkDiscountUpdate(BaseModel):
+    discount_percentage: float = Field(..., ge=0, le=100)
+    # Hotels to update: any of the owner's hotels matching all given selectors
+    hotel_ids: Optional[List[str]] = None
+    city: Optional[str] = None
+    all_hotels: bool = False  # Required to update every hotel when no selector is given
+
+class UploadSessionCreate(BaseModel):
+    size: int = Field(..., gt=0)  # Total bytes of the file
+    filename: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    size: int
+    offset: int  # Bytes received so far; the next chunk starts here
+    filename: Optional[str] = None
+    expires_at: datetime
+
+class UploadSessionFinalize(BaseModel):
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$")  # Checksum of the whole file
+
 class BookingBase(BaseModel):
     hotel_id: str
     check_in_date: datetime
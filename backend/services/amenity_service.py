@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event, select, insert, delete, func, distinct
+from sqlalchemy.orm import Session
+import models
+
+load_dotenv()
+
+_PENDING_KEY = "amenity_index_pending"
+
+
+class AmenityIndex:
+    """Normalized amenity index for hotel filtering.
+
+    ``Hotel.amenities`` (a JSON list of names) stays the source of truth for API
+    responses; every hotel write mirrors it into the ``hotel_amenities`` join
+    table (one row per hotel and ``Amenity``) so amenity filters run in SQL.
+    An in-process bitset per hotel (one bit per amenity) answers match-any /
+    match-all checks for small candidate sets, such as a user's favorites,
+    without touching the database. Writes are applied to the bitsets when their
+    transaction commits; a periodic reload picks up writes from other workers.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = int(os.getenv("AMENITY_INDEX_REFRESH_SECONDS", 60))
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._bits: Dict[str, int] = {}  # amenity name -> bit position
+        self._masks: Dict[str, int] = {}  # hotel_id -> amenity bitset
+
+    def parse(self, amenities: str) -> List[str]:
+        """Parse a comma-separated amenities parameter"""
+        return list(dict.fromkeys(name.strip() for name in amenities.split(",") if name.strip()))
+
+    def _names(self, amenities) -> List[str]:
+        if not isinstance(amenities, list):
+            return []
+        return list(dict.fromkeys(str(name).strip() for name in amenities if name and str(name).strip()))
+
+    # Join table
+
+    def _amenity_ids(self, conn, names: Sequence[str]) -> Dict[str, str]:
+        """Look up amenity ids by name, creating missing amenities"""
+        if not names:
+            return {}
+
+        table = models.Amenity.__table__
+        ids = dict(conn.execute(select(table.c.name, table.c.id).where(table.c.name.in_(names))).all())
+        missing = [{"id": str(uuid.uuid4()), "name": name, "category": "general", "is_active": True} for name in names if name not in ids]
+        if missing:
+            conn.execute(insert(table), missing)
+            ids.update({row["name"]: row["id"] for row in missing})
+        return ids
+
+    def _write_links(self, conn, hotel_id: str, names: Sequence[str]):
+        table = models.HotelAmenity.__table__
+        conn.execute(delete(table).where(table.c.hotel_id == hotel_id))
+        ids = self._amenity_ids(conn, names)
+        if ids:
+            conn.execute(insert(table), [{"hotel_id": hotel_id, "amenity_id": ids[name]} for name in names])
+
+    # Index interface used by HotelIndexes
+
+    def ensure_index(self, conn):
+        """Backfill the join table from Hotel.amenities when it is empty"""
+        links = models.HotelAmenity.__table__
+        if conn.execute(select(links.c.hotel_id).limit(1)).first():
+            return
+
+        hotels = models.Hotel.__table__
+        rows = conn.execute(select(hotels.c.id, hotels.c.amenities).where(hotels.c.amenities.isnot(None))).all()
+        for hotel_id, amenities in rows:
+            names = self._names(amenities)
+            if names:
+                self._write_links(conn, hotel_id, names)
+        conn.commit()
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        """Mirror a hotel's amenities into the join table (hotel must be flushed)"""
+        names = self._names(hotel.amenities)
+        self._write_links(db.connection(), hotel.id, names)
+        db.info.setdefault(_PENDING_KEY, []).append((hotel.id, names))
+
+    def index_hotels(self, db: Session, hotels: List[models.Hotel]):
+        """Batch form of index_hotel for bulk writes"""
+        if not hotels:
+            return
+
+        conn = db.connection()
+        table = models.HotelAmenity.__table__
+        names = {hotel.id: self._names(hotel.amenities) for hotel in hotels}
+        conn.execute(delete(table).where(table.c.hotel_id.in_(list(names))))
+        ids = self._amenity_ids(conn, list(dict.fromkeys(name for hotel_names in names.values() for name in hotel_names)))
+        links = [{"hotel_id": hotel_id, "amenity_id": ids[name]} for hotel_id, hotel_names in names.items() for name in hotel_names]
+        if links:
+            conn.execute(insert(table), links)
+        db.info.setdefault(_PENDING_KEY, []).extend(names.items())
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        table = models.HotelAmenity.__table__
+        db.execute(delete(table).where(table.c.hotel_id == hotel_id))
+        db.info.setdefault(_PENDING_KEY, []).append((hotel_id, None))
+
+    def filter_query(self, query, names: Sequence[str], match_all: bool = False):
+        """Restrict a hotel query to hotels having any (or all) of the named amenities"""
+        links = models.HotelAmenity.__table__
+        amenities = models.Amenity.__table__
+        matching = select(links.c.hotel_id).join(amenities, amenities.c.id == links.c.amenity_id).where(amenities.c.name.in_(names))
+        if match_all:
+            matching = matching.group_by(links.c.hotel_id).having(func.count(distinct(links.c.amenity_id)) == len(names))
+        return query.filter(models.Hotel.id.in_(matching))
+
+    # Bitsets
+
+    def _bit(self, name: str) -> int:
+        bit = self._bits.get(name)
+        if bit is None:
+            bit = self._bits[name] = len(self._bits)
+        return bit
+
+    def _mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= 1 << self._bit(name)
+        return mask
+
+    def load(self, db: Session):
+        """Rebuild the bitsets from the join table"""
+        rows = db.query(models.HotelAmenity.hotel_id, models.Amenity.name).join(
+            models.Amenity, models.Amenity.id == models.HotelAmenity.amenity_id
+        ).all()
+
+        with self._lock:
+            self._bits = {}
+            self._masks = {}
+            for hotel_id, name in rows:
+                self._masks[hotel_id] = self._masks.get(hotel_id, 0) | (1 << self._bit(name))
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(db)
+
+    def apply(self, changes: Sequence[Tuple[str, Optional[List[str]]]]):
+        """Apply committed (hotel_id, amenity names) changes; None removes the hotel"""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Not loaded yet, the first load will see the committed rows
+
+            for hotel_id, names in changes:
+                if names:
+                    self._masks[hotel_id] = self._mask(names)
+                else:
+                    self._masks.pop(hotel_id, None)
+
+    def matching(self, db: Session, names: Sequence[str], match_all: bool, hotel_ids: Iterable[str]) -> Set[str]:
+        """
+        Return the hotels among ``hotel_ids`` that have any (or all) of the named amenities.
+        """
+        self.ensure_loaded(db)
+        with self._lock:
+            known = [name for name in names if name in self._bits]
+            if not known or (match_all and len(known) < len(names)):
+                return set()
+            wanted = self._mask(known)
+
+            if match_all:
+                return {hotel_id for hotel_id in hotel_ids if self._masks.get(hotel_id, 0) & wanted == wanted}
+            return {hotel_id for hotel_id in hotel_ids if self._masks.get(hotel_id, 0) & wanted}
+
+
+# Singleton instance
+amenity_index = AmenityIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_amenity_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        amenity_index.apply(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_amenity_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,260 @@
+import bisect
+import heapq
+import math
+import os
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+import models
+
+load_dotenv()
+
+_PENDING_KEY = "autocomplete_pending"
+
+MAX_SUGGESTIONS = 20
+
+# Prefixes matching at least this many keys keep their top entries memoized,
+# with some headroom so removals rarely force a rescan
+_MEMO_MIN_RANGE = 256
+_MEMO_SIZE = 64
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase and strip accents (so "zur" matches "Zürich")"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+class AutocompleteIndex:
+    """In-process prefix index for search-box suggestions.
+
+    Every hotel name (from each word onwards, so "Grand Hotel Paris" matches
+    "hot"), city and country is kept as a normalized key in one sorted list;
+    a prefix lookup is a ``bisect`` into that list followed by a scan of the
+    matching range, keeping the highest weighted entries. Hotels are weighted
+    by rating and booking count, cities and countries by their summed hotel
+    weights. Short, popular prefixes match large ranges, so their top entries
+    are memoized and kept current as entries are added or re-weighted.
+
+    The index is built on first use, updated when hotel writes commit and
+    reloaded every AUTOCOMPLETE_REFRESH_SECONDS to pick up other workers'
+    writes and rating changes.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = int(os.getenv("AUTOCOMPLETE_REFRESH_SECONDS", 300))
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._bulk = False
+        self._keys: List[Tuple[str, str, str]] = []  # sorted (normalized text, kind, ref)
+        self._hotels: Dict[str, dict] = {}  # hotel_id -> name, city, country, bookings, weight, texts
+        self._places: Dict[Tuple[str, str], dict] = {}  # (kind, normalized) -> text, hotels, weight
+        self._memo: Dict[str, List[Tuple[float, str, str]]] = {}  # prefix -> top (weight, kind, ref)
+
+    # Index interface used by HotelIndexes
+
+    def ensure_index(self, conn):
+        pass
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        db.info.setdefault(_PENDING_KEY, []).append(
+            (hotel.id, {"name": hotel.name, "city": hotel.city, "country": hotel.country, "rating": hotel.rating})
+        )
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        db.info.setdefault(_PENDING_KEY, []).append((hotel_id, None))
+
+    # Storage (callers hold the lock)
+
+    def _weight(self, rating: Optional[float], bookings: int) -> float:
+        return float(rating or 0) + math.log1p(bookings)
+
+    def _insert_key(self, key: Tuple[str, str, str]):
+        if self._bulk:
+            self._keys.append(key)  # Sorted once at the end of load()
+            return
+        position = bisect.bisect_left(self._keys, key)
+        if position == len(self._keys) or self._keys[position] != key:
+            self._keys.insert(position, key)
+
+    def _remove_key(self, key: Tuple[str, str, str]):
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def _rank(self, entry: Tuple[float, str, str]):
+        weight, kind, ref = entry
+        return (-weight, kind, ref)
+
+    def _touch(self, texts: Sequence[str], kind: str, ref: str, weight: Optional[float]):
+        """
+        Keep memoized prefixes of ``texts`` current after an entry was added, re-weighted
+        or removed (``weight`` None). A memo holds the best entries of its range in rank
+        order, and every entry it does not hold ranks below its last one.
+        """
+        if self._bulk or not self._memo:
+            return
+        for text in texts:
+            for i in range(1, len(text) + 1):
+                top = self._memo.get(text[:i])
+                if top is None:
+                    continue
+                position = next((j for j, (_, k, r) in enumerate(top) if k == kind and r == ref), None)
+                if position is not None:
+                    del top[position]
+                if weight is not None and top and self._rank((weight, kind, ref)) < self._rank(top[-1]):
+                    bisect.insort(top, (weight, kind, ref), key=self._rank)
+                    del top[_MEMO_SIZE:]
+
+    def _add_place(self, kind: str, text: Optional[str], weight: float):
+        normalized = normalize(text)
+        if not normalized:
+            return
+        place = self._places.get((kind, normalized))
+        if place is None:
+            place = self._places[(kind, normalized)] = {"text": text.strip(), "hotels": 0, "weight": 0.0}
+            self._insert_key((normalized, kind, normalized))
+        place["hotels"] += 1
+        place["weight"] += weight
+        self._touch([normalized], kind, normalized, place["weight"])
+
+    def _remove_place(self, kind: str, text: Optional[str], weight: float):
+        normalized = normalize(text)
+        place = self._places.get((kind, normalized))
+        if place is None:
+            return
+        place["hotels"] -= 1
+        place["weight"] -= weight
+        if place["hotels"] <= 0:
+            del self._places[(kind, normalized)]
+            self._remove_key((normalized, kind, normalized))
+            self._touch([normalized], kind, normalized, None)
+        else:
+            self._touch([normalized], kind, normalized, place["weight"])
+
+    def _add_hotel(self, hotel_id: str, name: Optional[str], city: Optional[str], country: Optional[str], rating: Optional[float], bookings: int = 0):
+        words = normalize(name).split()
+        # One key per word start: "grand hotel paris", "hotel paris", "paris"
+        texts = [" ".join(words[i:]) for i in range(len(words))]
+        weight = self._weight(rating, bookings)
+        self._hotels[hotel_id] = {
+            "name": name, "city": city, "country": country,
+            "bookings": bookings, "weight": weight, "texts": texts,
+        }
+        for text in texts:
+            self._insert_key((text, "hotel", hotel_id))
+        self._touch(texts, "hotel", hotel_id, weight)
+        self._add_place("city", city, weight)
+        self._add_place("country", country, weight)
+
+    def _remove_hotel(self, hotel_id: str) -> Optional[dict]:
+        hotel = self._hotels.pop(hotel_id, None)
+        if hotel is None:
+            return None
+        for text in hotel["texts"]:
+            self._remove_key((text, "hotel", hotel_id))
+        self._touch(hotel["texts"], "hotel", hotel_id, None)
+        self._remove_place("city", hotel["city"], hotel["weight"])
+        self._remove_place("country", hotel["country"], hotel["weight"])
+        return hotel
+
+    def load(self, db: Session):
+        """Rebuild the index from the hotels table"""
+        bookings = dict(db.query(models.Booking.hotel_id, func.count(models.Booking.id)).group_by(models.Booking.hotel_id).all())
+        rows = db.query(models.Hotel.id, models.Hotel.name, models.Hotel.city, models.Hotel.country, models.Hotel.rating).all()
+
+        # Build a fresh index off to the side so lookups are not blocked meanwhile
+        fresh = AutocompleteIndex()
+        fresh._bulk = True
+        for hotel_id, name, city, country, rating in rows:
+            fresh._add_hotel(hotel_id, name, city, country, rating, bookings.get(hotel_id, 0))
+        fresh._keys.sort()
+        fresh._bulk = False
+        for prefix in list(self._memo):
+            fresh._top(prefix)  # Keep prefixes that were in use warm
+
+        with self._lock:
+            self._keys = fresh._keys
+            self._hotels = fresh._hotels
+            self._places = fresh._places
+            self._memo = fresh._memo
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(db)
+
+    def apply(self, changes: Sequence[Tuple[str, Optional[dict]]]):
+        """Apply committed (hotel_id, fields) changes; None removes the hotel"""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Not loaded yet, the first load will see the committed rows
+
+            for hotel_id, fields in changes:
+                previous = self._remove_hotel(hotel_id)
+                if fields is not None:
+                    bookings = previous["bookings"] if previous else 0
+                    self._add_hotel(hotel_id, fields["name"], fields["city"], fields["country"], fields["rating"], bookings)
+
+    # Queries
+
+    def _suggestion(self, kind: str, ref: str) -> dict:
+        if kind == "hotel":
+            hotel = self._hotels[ref]
+            subtitle = ", ".join(part for part in (hotel["city"], hotel["country"]) if part)
+            return {"type": "hotel", "text": hotel["name"], "subtitle": subtitle or None, "hotel_id": ref}
+        place = self._places[(kind, ref)]
+        return {"type": kind, "text": place["text"], "subtitle": f"{place['hotels']} hotels", "hotel_id": None}
+
+    def _entry_weight(self, kind: str, ref: str) -> float:
+        if kind == "hotel":
+            return self._hotels[ref]["weight"]
+        return self._places[(kind, ref)]["weight"]
+
+    def _top(self, prefix: str) -> List[Tuple[float, str, str]]:
+        top = self._memo.get(prefix)
+        if top is not None and len(top) >= MAX_SUGGESTIONS:
+            return top
+
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        matches = {(kind, ref) for _, kind, ref in self._keys[start:end]}
+        top = heapq.nsmallest(
+            _MEMO_SIZE,
+            ((self._entry_weight(kind, ref), kind, ref) for kind, ref in matches),
+            key=self._rank
+        )
+        if end - start >= _MEMO_MIN_RANGE:
+            self._memo[prefix] = top
+        else:
+            self._memo.pop(prefix, None)
+        return top
+
+    def suggest(self, db: Session, q: str, limit: int = 10) -> List[dict]:
+        """Return up to ``limit`` suggestions whose name, city or country starts with ``q``"""
+        prefix = normalize(q)
+        if not prefix:
+            return []
+
+        self.ensure_loaded(db)
+        with self._lock:
+            return [self._suggestion(kind, ref) for _, kind, ref in self._top(prefix)[:limit]]
+
+
+# Singleton instance
+autocomplete_index = AutocompleteIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_autocomplete_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        autocomplete_index.apply(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_autocomplete_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,273 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect, update, func
+from sqlalchemy.orm import Session
+import models
+
+load_dotenv()
+
+# Response headers set by endpoints that must be replayed from the cache
+CACHED_HEADERS = {"x-next-cursor"}
+
+
+class ResponseCache:
+    """HTTP caching for public, read-heavy catalog endpoints.
+
+    Every cached endpoint depends on one or more namespaces whose version
+    counters live in the cache_versions table. "hotels" covers listing and
+    search responses, "hotel:<id>" a single hotel's own pages,
+    "reviews:<hotel_id>" its reviews, "users" embedded user names and avatars
+    and "favorites:<user_id>" a user's favorite flags. Versions are bumped in
+    the same transaction as the write (see the before_flush hook below), so
+    every worker sees the change. A change to a hotel's ``available_rooms``
+    alone only bumps "hotel:<id>", so bookings do not invalidate every
+    listing (listed room counts may lag until the next catalog change;
+    bookings always check the database row). The ETag combines the versions
+    with the request path and query string, which lets clients revalidate
+    with If-None-Match and lets the server keep rendered bodies in a small
+    in-process LRU keyed by ETag.
+    """
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+        self.max_age = int(os.getenv("RESPONSE_CACHE_MAX_AGE", 0))
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Versions
+
+    def invalidate(self, db: Session, *namespaces: str):
+        """Bump namespace versions inside the caller's transaction (for writes that bypass the ORM)"""
+        self._bump(db, namespaces)
+
+    def _bump(self, db: Session, namespaces: Iterable[str]):
+        namespaces = sorted(set(namespaces))
+        if not namespaces:
+            return
+
+        conn = db.connection()
+        table = models.CacheVersion.__table__
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            insert = None
+
+        if insert is not None:
+            conn.execute(
+                insert(table).on_conflict_do_nothing(index_elements=["namespace"]),
+                [{"namespace": namespace, "version": 0} for namespace in namespaces]
+            )
+        else:
+            existing = {row[0] for row in conn.execute(table.select().with_only_columns(table.c.namespace).where(table.c.namespace.in_(namespaces)))}
+            missing = [{"namespace": namespace, "version": 0} for namespace in namespaces if namespace not in existing]
+            if missing:
+                conn.execute(table.insert(), missing)
+
+        conn.execute(
+            update(table)
+            .where(table.c.namespace.in_(namespaces))
+            .values(version=table.c.version + 1, updated_at=func.now())
+        )
+
+    def current_versions(self, db: Session, namespaces: List[str]) -> Tuple[Dict[str, int], Optional[datetime]]:
+        rows = db.query(models.CacheVersion).filter(models.CacheVersion.namespace.in_(namespaces)).all()
+        versions = {namespace: 0 for namespace in namespaces}
+        last_modified = None
+        for row in rows:
+            versions[row.namespace] = row.version
+            if row.updated_at and (last_modified is None or row.updated_at > last_modified):
+                last_modified = row.updated_at
+        return versions, last_modified
+
+    # HTTP helpers
+
+    def _etag(self, request: Request, versions: Dict[str, int], token: Optional[str] = None) -> str:
+        query = sorted(request.query_params.multi_items())
+        key = json.dumps([request.url.path, query, sorted(versions.items()), token], separators=(",", ":"))
+        return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+    def _headers(self, etag: str, last_modified: Optional[datetime], private: bool = False) -> Dict[str, str]:
+        headers = {"ETag": etag}
+        scope = "private" if private else "public"  # Signed-in responses may carry per-user fields
+        if self.max_age > 0:
+            headers["Cache-Control"] = f"{scope}, max-age={self.max_age}"
+        else:
+            headers["Cache-Control"] = f"{scope}, max-age=0, must-revalidate"
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def _not_modified(self, request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            return last_modified.replace(microsecond=0) <= since
+        return False
+
+    # Body cache
+
+    def _get(self, etag: str):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def _put(self, etag: str, entry: Tuple[bytes, Dict[str, str]]):
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def cached(self, *namespaces: str, response_model=None, vary=None):
+        """
+        Decorator for GET endpoints taking ``request: Request`` and ``db: Session``.
+
+        Args:
+            namespaces: Namespace templates formatted with the endpoint's arguments, e.g. "reviews:{hotel_id}",
+                or callables taking the endpoint's arguments and returning a namespace or None
+            response_model: Model used to serialize the endpoint result (same as the route's response_model)
+            vary: Optional callable taking the endpoint's arguments and returning None or (token, last_modified)
+                for state outside the database that the response depends on (e.g. exchange rates)
+        """
+        adapter = TypeAdapter(response_model) if response_model is not None else None
+
+        def decorator(endpoint):
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                request: Request = kwargs["request"]
+                db: Session = kwargs["db"]
+                names = [
+                    namespace(kwargs) if callable(namespace) else namespace.format(**kwargs)
+                    for namespace in namespaces
+                ]
+                names = [name for name in names if name]
+
+                versions, last_modified = self.current_versions(db, names)
+                token = None
+                validator = vary(kwargs) if vary is not None else None
+                if validator is not None:
+                    token, modified = validator
+                    if last_modified is not None and last_modified.tzinfo is None:
+                        last_modified = last_modified.replace(tzinfo=timezone.utc)
+                    if modified is not None and (last_modified is None or modified > last_modified):
+                        last_modified = modified
+                etag = self._etag(request, versions, token)
+                headers = self._headers(etag, last_modified, private="authorization" in request.headers)
+                if self._not_modified(request, etag, last_modified):
+                    return Response(status_code=304, headers=headers)
+
+                entry = self._get(etag)
+                if entry is None:
+                    result = endpoint(*args, **kwargs)
+                    if isinstance(result, Response):
+                        return result
+
+                    if adapter is not None:
+                        body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+                    else:
+                        body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+
+                    sub_response = kwargs.get("response")
+                    extra_headers = {}
+                    if sub_response is not None:
+                        extra_headers = {k: v for k, v in sub_response.headers.items() if k.lower() in CACHED_HEADERS}
+                    entry = (body, extra_headers)
+                    self._put(etag, entry)
+
+                body, extra_headers = entry
+                return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
+            return wrapper
+        return decorator
+
+
+# Singleton instance
+response_cache = ResponseCache()
+
+
+def _changed(obj, attributes) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+def _hotel_namespaces(obj: models.Hotel) -> List[str]:
+    """Namespaces invalidated by an update to a loaded hotel"""
+    state = inspect(obj)
+    changed = {attr.key for attr in state.attrs if attr.history.has_changes()}
+    if not changed:
+        return []
+    if changed == {"available_rooms"}:
+        # Bookings and cancellations: listings only change when a hotel sells out or reopens
+        history = state.attrs.available_rooms.history
+        before = history.deleted[0] if history.deleted else None
+        if (before or 0) > 0 and (obj.available_rooms or 0) > 0:
+            return [f"hotel:{obj.id}"]
+    return ["hotels", f"hotel:{obj.id}"]
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_cache_versions(session, flush_context, instances):
+    namespaces = set()
+
+    for obj in session.new:
+        if isinstance(obj, models.Hotel):
+            namespaces.add("hotels")
+        elif isinstance(obj, models.Review):
+            namespaces.add(f"reviews:{obj.hotel_id}")
+        elif isinstance(obj, models.RoomType):
+            namespaces.add(f"hotel:{obj.hotel_id}")
+        elif isinstance(obj, models.UserFavoriteHotel):
+            namespaces.add(f"favorites:{obj.user_id}")
+
+    for obj in session.deleted:
+        if isinstance(obj, models.Hotel):
+            namespaces.update(["hotels", f"hotel:{obj.id}", f"reviews:{obj.id}"])
+        elif isinstance(obj, models.Review):
+            namespaces.add(f"reviews:{obj.hotel_id}")
+        elif isinstance(obj, models.RoomType):
+            namespaces.add(f"hotel:{obj.hotel_id}")
+        elif isinstance(obj, models.UserFavoriteHotel):
+            namespaces.add(f"favorites:{obj.user_id}")
+
+    for obj in session.dirty:
+        if isinstance(obj, models.Hotel) and session.is_modified(obj):
+            namespaces.update(_hotel_namespaces(obj))
+        elif isinstance(obj, models.Review) and session.is_modified(obj):
+            namespaces.add(f"reviews:{obj.hotel_id}")
+        elif isinstance(obj, models.RoomType) and session.is_modified(obj):
+            namespaces.add(f"hotel:{obj.hotel_id}")
+        elif isinstance(obj, models.User):
+            if _changed(obj, ["full_name", "username"]):
+                namespaces.add("hotels")  # Owner names are embedded in hotel listings
+            if _changed(obj, ["full_name", "username", "profile_image"]):
+                namespaces.add("users")  # Owner, reviewer names and avatars on single hotel pages and reviews
+
+    if namespaces:
+        response_cache._bump(session, namespaces)
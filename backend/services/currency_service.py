@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+import schemas
+
+load_dotenv()
+
+BASE_CURRENCY = "USD"
+
+# Hotel response fields holding amounts in the hotel's currency
+PRICE_FIELDS = ("price_per_night", "discount_price")
+
+
+class CurrencyConverter:
+    """Exchange-rate table for rendering prices in the caller's currency.
+
+    Rates are read from the JSON file at FX_RATES_FILE::
+
+        {"base": "USD", "rates": {"EUR": 0.92, "GBP": 0.79}}
+
+    (units of each currency per unit of the base) and kept in memory. The
+    file is checked for changes every FX_RATES_REFRESH_SECONDS, so rates can
+    be updated by a cron job without a restart. Without a file only the base
+    currency is known. Whole result pages are converted in one vectorized
+    pass over their price columns.
+    """
+
+    def __init__(self):
+        self.path = os.getenv("FX_RATES_FILE", "fx_rates.json")
+        self.refresh_seconds = int(os.getenv("FX_RATES_REFRESH_SECONDS", 3600))
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._mtime: Optional[float] = None
+        self._rates: Dict[str, float] = {BASE_CURRENCY: 1.0}
+        self._version = BASE_CURRENCY
+        self._modified: Optional[datetime] = None
+
+    def load(self):
+        """(Re)read the rates file"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+
+        rates = {BASE_CURRENCY: 1.0}
+        if mtime is not None:
+            with open(self.path) as f:
+                data = json.load(f)
+            base = str(data.get("base", BASE_CURRENCY)).upper()
+            table = {str(code).upper(): float(rate) for code, rate in data.get("rates", {}).items() if rate}
+            table[base] = 1.0
+            if BASE_CURRENCY not in table:
+                raise ValueError(f"FX rates file has no {BASE_CURRENCY} rate")
+            # Re-express against BASE_CURRENCY so the base of the file does not matter
+            rates = {code: rate / table[BASE_CURRENCY] for code, rate in table.items()}
+
+        version = hashlib.sha1(json.dumps(sorted(rates.items())).encode()).hexdigest()[:16]
+        with self._lock:
+            self._rates = rates
+            self._version = version
+            self._mtime = mtime
+            self._modified = datetime.fromtimestamp(mtime, tz=timezone.utc) if mtime is not None else None
+            self._checked_at = time.monotonic()
+
+    def ensure_loaded(self):
+        if self._checked_at is not None and time.monotonic() - self._checked_at <= self.refresh_seconds:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if self._checked_at is None or mtime != self._mtime:
+            try:
+                self.load()
+                return
+            except (OSError, ValueError) as e:
+                print(f"Failed to load FX rates from {self.path}: {e}")
+        self._checked_at = time.monotonic()  # Keep the current table until the next check
+
+    def cache_validator(self, kwargs: dict) -> Optional[Tuple[str, Optional[datetime]]]:
+        """Response cache ``vary`` hook: converted responses change with the rates table"""
+        if not kwargs.get("currency"):
+            return None
+        self.ensure_loaded()
+        return self._version, self._modified
+
+    def parse(self, currency: Optional[str]) -> Optional[str]:
+        """Validate a ``currency`` query parameter (None keeps prices in each hotel's currency)"""
+        if not currency:
+            return None
+        self.ensure_loaded()
+        code = currency.strip().upper()
+        if code not in self._rates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported currency: {currency}. Available: {', '.join(sorted(self._rates))}"
+            )
+        return code
+
+    def rate(self, source: Optional[str], target: Optional[str]) -> Optional[float]:
+        """Units of ``target`` per unit of ``source``, or None if either is unknown"""
+        self.ensure_loaded()
+        rates = self._rates
+        source = (source or BASE_CURRENCY).upper()
+        target = (target or BASE_CURRENCY).upper()
+        if source not in rates or target not in rates:
+            return None
+        return rates[target] / rates[source]
+
+    def exchange_rate(self, source: Optional[str], target: Optional[str]) -> Optional[float]:
+        """Rate to record on a payment settled in ``target`` for an amount in ``source`` (None if no conversion)"""
+        if (source or BASE_CURRENCY).upper() == (target or BASE_CURRENCY).upper():
+            return None
+        return self.rate(source, target)
+
+    def convert(self, amounts: np.ndarray, sources: List[Optional[str]], target: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert a (rows, columns) array of amounts from per-row source currencies to ``target``.
+
+        Returns:
+            Tuple: (converted amounts rounded to cents, mask of rows whose currency is known)
+        """
+        rates = self._rates
+        codes, inverse = np.unique([(code or BASE_CURRENCY).upper() for code in sources], return_inverse=True)
+        factors = rates[target] / np.array([rates.get(code, np.nan) for code in codes])[inverse]
+        return np.round(amounts * factors[:, None], 2), ~np.isnan(factors)
+
+    def convert_hotels(self, hotels: list, currency: str) -> List[dict]:
+        """
+        Render a page of hotels (ORM objects or projection dicts) as dicts with prices in ``currency``.
+        Hotels in a currency missing from the table keep their own prices and currency.
+        """
+        items = [hotel if isinstance(hotel, dict) else schemas.HotelResponse.model_validate(hotel).model_dump() for hotel in hotels]
+        if not items:
+            return items
+
+        fields = [field for field in PRICE_FIELDS if field in items[0]]
+        amounts = np.array(
+            [[np.nan if item[field] is None else float(item[field]) for field in fields] for item in items],
+            dtype=np.float64
+        ).reshape(len(items), len(fields))
+        converted, convertible = self.convert(amounts, [item.get("currency") for item in items], currency)
+
+        for item, row, known in zip(items, converted, convertible):
+            if known:
+                item.update({field: None if np.isnan(value) else float(value) for field, value in zip(fields, row)})
+                item["currency"] = currency
+        return items
+
+
+# Singleton instance
+currency_converter = CurrencyConverter()
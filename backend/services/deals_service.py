@@ -0,0 +1,122 @@
+from sqlalchemy import case, event, func, literal, text, update
+from sqlalchemy.sql.expression import ClauseElement
+import models
+
+# Score weights: is_deal dominates, then the discount (2 decimals), then the 0-5 rating
+DEAL_WEIGHT = 10_000_000
+DISCOUNT_WEIGHT = 10_000
+
+
+class DealRanking:
+    """Materialized ranking for the deals feed.
+
+    ``effective_price_per_night`` and ``deal_score`` are derived from the
+    pricing, discount and rating columns whenever a hotel is inserted or
+    updated through the ORM, so the deals feed can be read in order from the
+    ``idx_hotels_deal_rank`` index instead of sorting every hotel per request.
+    Ordering by ``deal_score DESC, effective_price_per_night ASC`` matches the
+    previous ``is_deal, discount_percentage, rating DESC, price ASC`` ordering.
+    ``effective_price_per_night`` is also the price every listing filters and
+    sorts on, through ``idx_hotels_effective_price``.
+    """
+
+    # Python side, used by the ORM hooks below
+
+    def effective_price(self, hotel: models.Hotel):
+        if hotel.is_deal and hotel.discount_price is not None:
+            return float(hotel.discount_price)
+        if hotel.price_per_night is not None:
+            return hotel.price_per_night
+        if hotel.base_price_per_night is not None:
+            return float(hotel.base_price_per_night)
+        return None
+
+    def deal_score(self, hotel: models.Hotel) -> float:
+        score = DEAL_WEIGHT if hotel.is_deal else 0
+        score += round(float(hotel.discount_percentage or 0), 2) * DISCOUNT_WEIGHT
+        score += float(hotel.rating or 0)
+        return score
+
+    def refresh(self, hotel: models.Hotel):
+        hotel.effective_price_per_night = self.effective_price(hotel)
+        hotel.deal_score = self.deal_score(hotel)
+
+    # SQL side, used for backfills and set-based updates. ``values`` overrides
+    # pricing columns with the expressions (or constants) an UPDATE assigns to
+    # them, since the right-hand side of SET only sees the old row.
+
+    def _column(self, table, values: dict, name: str):
+        if name not in values:
+            return table.c[name]
+        value = values[name]
+        return value if isinstance(value, ClauseElement) else literal(value, table.c[name].type)
+
+    def discount_price_sql(self, discount_percentage: float, table=None):
+        """Discounted nightly price for a percentage, as computed by update_hotel_discount"""
+        table = table if table is not None else models.Hotel.__table__
+        if discount_percentage <= 0:
+            return None
+        original_price = func.coalesce(table.c.price_per_night, table.c.base_price_per_night, 0)
+        return original_price * (1 - discount_percentage / 100)
+
+    def effective_price_sql(self, table=None, **values):
+        table = table if table is not None else models.Hotel.__table__
+        discount_price = self._column(table, values, "discount_price")
+        return case(
+            ((self._column(table, values, "is_deal") == True) & discount_price.isnot(None), discount_price),
+            else_=func.coalesce(table.c.price_per_night, table.c.base_price_per_night)
+        )
+
+    def deal_score_sql(self, table=None, **values):
+        table = table if table is not None else models.Hotel.__table__
+        return (
+            case((self._column(table, values, "is_deal") == True, DEAL_WEIGHT), else_=0)
+            + func.round(func.coalesce(self._column(table, values, "discount_percentage"), 0), 2) * DISCOUNT_WEIGHT
+            + func.coalesce(table.c.rating, 0)
+        )
+
+    def ranking_values(self, table=None, **values):
+        """Column values for an UPDATE that recomputes the ranking in SQL"""
+        return {
+            "effective_price_per_night": self.effective_price_sql(table, **values),
+            "deal_score": self.deal_score_sql(table, **values),
+        }
+
+    def backfill(self, conn, missing_only: bool = False):
+        """Compute the ranking for rows written before the columns existed (or still lacking a price)"""
+        table = models.Hotel.__table__
+        statement = update(table).values(**self.ranking_values(table))
+        if missing_only:
+            statement = statement.where(table.c.effective_price_per_night.is_(None))
+        conn.execute(statement)
+        conn.commit()
+
+    # Index interface used by HotelIndexes (the columns themselves are kept
+    # current by the mapper hooks below, so there is nothing to sync per hotel)
+
+    def ensure_index(self, conn):
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_hotels_deal_rank
+            ON hotels (deal_score DESC, effective_price_per_night, id)
+        """))
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_hotels_effective_price
+            ON hotels (effective_price_per_night, id)
+        """))
+        conn.commit()
+
+    def index_hotel(self, db, hotel: models.Hotel):
+        pass
+
+    def remove_hotel(self, db, hotel_id: str):
+        pass
+
+
+# Singleton instance
+deal_ranking = DealRanking()
+
+
+@event.listens_for(models.Hotel, "before_insert")
+@event.listens_for(models.Hotel, "before_update")
+def _refresh_deal_ranking(mapper, connection, hotel):
+    deal_ranking.refresh(hotel)
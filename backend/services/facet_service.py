@@ -0,0 +1,101 @@
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Query, Session
+import models
+
+# (label, lower bound inclusive, upper bound exclusive) over the effective nightly price, in the hotel's currency
+PRICE_BUCKETS: List[Tuple[str, float, Optional[float]]] = [
+    ("0-50", 0, 50),
+    ("50-100", 50, 100),
+    ("100-200", 100, 200),
+    ("200-500", 200, 500),
+    ("500+", 500, None),
+]
+
+FACETS = ("city", "star_rating", "price", "deal", "amenity")
+
+# Hotel column each facet groups by (amenities come from the hotel_amenities join table)
+FACET_COLUMNS = {
+    "city": models.Hotel.city,
+    "star_rating": models.Hotel.star_rating,
+    "price": models.Hotel.effective_price_per_night,
+    "deal": models.Hotel.is_deal,
+}
+
+
+class HotelFacets:
+    """Facet counts for the hotel filter sheet.
+
+    Counts are taken over the same filtered query that backs the listing (before
+    pagination): the filtered hotels become a subquery carrying only the columns
+    the requested facets need, and each facet is one GROUP BY over it. Amenities
+    are counted from the ``hotel_amenities`` join table rather than by decoding
+    each hotel's JSON list.
+    """
+
+    def parse(self, facets: str) -> List[str]:
+        """Parse a comma-separated ``facets`` parameter, rejecting unknown names"""
+        names = [name.strip().lower() for name in facets.split(",") if name.strip()]
+        unknown = [name for name in names if name not in FACETS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown facets: {', '.join(unknown)}. Available: {', '.join(FACETS)}"
+            )
+        return list(dict.fromkeys(names))
+
+    def price_bucket_sql(self, price):
+        """SQL expression labelling a price with its PRICE_BUCKETS entry (NULL outside them)"""
+        whens = []
+        for label, low, high in PRICE_BUCKETS:
+            condition = price >= low if high is None else and_(price >= low, price < high)
+            whens.append((condition, label))
+        return case(*whens, else_=None)
+
+    def _grouped(self, db: Session, key, source, *conditions) -> Dict[str, int]:
+        rows = db.execute(
+            select(key, func.count()).select_from(source).where(*conditions).group_by(key)
+        ).all()
+        return {str(value): count for value, count in rows}
+
+    def count(self, query: Query, names: List[str]) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """
+        Count facet values over a filtered hotel query.
+
+        Returns:
+            Tuple: (total matching hotels, {facet: {value: count}})
+        """
+        db = query.session
+        columns = [models.Hotel.id.label("id")]
+        for name in names:
+            if name in FACET_COLUMNS:
+                columns.append(FACET_COLUMNS[name].label(name))
+        filtered = query.with_entities(*columns).order_by(None).subquery()
+
+        total = db.execute(select(func.count()).select_from(filtered)).scalar()
+        facets = {}
+        for name in names:
+            if name == "city":
+                counts = self._grouped(db, filtered.c.city, filtered, filtered.c.city.isnot(None), filtered.c.city != "")
+            elif name == "star_rating":
+                counts = self._grouped(db, filtered.c.star_rating, filtered, filtered.c.star_rating.isnot(None))
+            elif name == "price":
+                bucket = self.price_bucket_sql(filtered.c.price)
+                counts = self._grouped(db, bucket, filtered, bucket.isnot(None))
+                counts = {label: counts.get(label, 0) for label, _, _ in PRICE_BUCKETS}
+            elif name == "deal":
+                counts = self._grouped(db, case((filtered.c.deal == True, "true"), else_="false"), filtered)
+            else:
+                links = models.HotelAmenity.__table__
+                amenities = models.Amenity.__table__
+                source = filtered.join(links, links.c.hotel_id == filtered.c.id).join(amenities, amenities.c.id == links.c.amenity_id)
+                counts = self._grouped(db, amenities.c.name, source)
+            if name != "price":
+                counts = dict(sorted(counts.items(), key=lambda item: -item[1]))
+            facets[name] = counts
+        return total, facets
+
+
+# Singleton instance
+hotel_facets = HotelFacets()
@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import models
+from utils.geo import bounding_box, EARTH_RADIUS_KM
+
+load_dotenv()
+
+_PENDING_KEY = "geo_engine_pending"
+
+
+class GeoEngine:
+    """In-process nearest-hotel engine backed by NumPy arrays.
+
+    Holds every geolocated hotel's id and coordinates in memory and answers
+    radius queries with one vectorized haversine over the bounding-box
+    candidates plus ``argpartition`` for the top-k, without touching the
+    database. Writes made through HotelIndexes are applied once their
+    transaction commits; a periodic reload picks up writes from other workers.
+
+    Enabled with GEO_ENGINE_ENABLED=true, otherwise /nearby uses the SQL path.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("GEO_ENGINE_ENABLED", "false").lower() == "true"
+        self.refresh_seconds = int(os.getenv("GEO_ENGINE_REFRESH_SECONDS", 300))
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._size = 0
+        self._ids = np.empty(0, dtype=object)
+        self._lat = np.empty(0, dtype=np.float64)  # degrees
+        self._lon = np.empty(0, dtype=np.float64)  # degrees
+        self._positions = {}  # hotel_id -> array position
+
+    # Index interface used by HotelIndexes
+
+    def ensure_index(self, conn):
+        pass
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        if self.enabled:
+            db.info.setdefault(_PENDING_KEY, []).append((hotel.id, hotel.latitude, hotel.longitude))
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        if self.enabled:
+            db.info.setdefault(_PENDING_KEY, []).append((hotel_id, None, None))
+
+    # Storage
+
+    def _grow(self, capacity: int):
+        def resize(array, fill):
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self._ids = resize(self._ids, None)
+        self._lat = resize(self._lat, np.nan)
+        self._lon = resize(self._lon, np.nan)
+
+    def load(self, db: Session):
+        """Rebuild the arrays from the hotels table"""
+        rows = db.query(models.Hotel.id, models.Hotel.latitude, models.Hotel.longitude).filter(
+            models.Hotel.latitude.isnot(None),
+            models.Hotel.longitude.isnot(None)
+        ).all()
+
+        with self._lock:
+            self._size = len(rows)
+            self._ids = np.empty(self._size, dtype=object)
+            self._ids[:] = [row[0] for row in rows]
+            self._lat = np.array([row[1] for row in rows], dtype=np.float64)
+            self._lon = np.array([row[2] for row in rows], dtype=np.float64)
+            self._positions = {hotel_id: i for i, hotel_id in enumerate(self._ids)}
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self.load(db)
+
+    def apply(self, changes: Sequence[Tuple[str, Optional[float], Optional[float]]]):
+        """Apply committed (hotel_id, latitude, longitude) changes; missing coordinates remove the hotel"""
+        with self._lock:
+            if self._loaded_at is None:
+                return  # Not loaded yet, the first load will see the committed rows
+
+            for hotel_id, lat, lon in changes:
+                position = self._positions.get(hotel_id)
+                if lat is None or lon is None:
+                    if position is not None:
+                        self._remove_at(position)
+                elif position is not None:
+                    self._lat[position] = lat
+                    self._lon[position] = lon
+                else:
+                    if self._size == len(self._lat):
+                        self._grow(max(16, self._size * 2))
+                    self._ids[self._size] = hotel_id
+                    self._lat[self._size] = lat
+                    self._lon[self._size] = lon
+                    self._positions[hotel_id] = self._size
+                    self._size += 1
+
+    def _remove_at(self, position: int):
+        # Swap with the last element so removal is O(1)
+        last = self._size - 1
+        removed_id = self._ids[position]
+        if position != last:
+            moved_id = self._ids[last]
+            self._ids[position] = moved_id
+            self._lat[position] = self._lat[last]
+            self._lon[position] = self._lon[last]
+            self._positions[moved_id] = position
+        self._ids[last] = None
+        self._size = last
+        del self._positions[removed_id]
+
+    # Queries
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        limit: int,
+        skip: int = 0,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to ``limit`` (hotel_id, distance_km) pairs within ``radius_km``, nearest first.
+
+        Args:
+            after: (distance_km, hotel_id) of the last row of the previous page, for cursor paging
+        """
+        with self._lock:
+            size = self._size
+            ids = self._ids[:size]
+            lats = self._lat[:size]
+            lons = self._lon[:size]
+
+            # Cheap bounding-box prefilter before the trigonometry
+            min_lat, max_lat, lon_ranges = bounding_box(lat, lon, radius_km)
+            mask = (lats >= min_lat) & (lats <= max_lat)
+            lon_mask = np.zeros(size, dtype=bool)
+            for lo, hi in lon_ranges:
+                lon_mask |= (lons >= lo) & (lons <= hi)
+            candidates = np.flatnonzero(mask & lon_mask)
+            cand_ids = ids[candidates]
+            cand_lat = np.radians(lats[candidates])
+            cand_lon = np.radians(lons[candidates])
+
+        lat1 = np.radians(lat)
+        a = np.sin((cand_lat - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(cand_lat) * np.sin((cand_lon - np.radians(lon)) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+        keep = distances <= radius_km
+        if after is not None:
+            after_distance, after_id = after
+            keep &= (distances > after_distance) | ((distances == after_distance) & (cand_ids > after_id))
+        distances = distances[keep]
+        cand_ids = cand_ids[keep]
+
+        k = min(len(distances), skip + limit)
+        if k == 0:
+            return []
+        if k < len(distances):
+            # Widen the partition to include every distance tied with the k-th so ids break ties exactly
+            kth = distances[np.argpartition(distances, k - 1)[k - 1]]
+            top = np.flatnonzero(distances <= kth)
+        else:
+            top = np.arange(len(distances))
+
+        order = top[np.lexsort((cand_ids[top], distances[top]))][skip:skip + limit]
+        return [(cand_ids[i], float(distances[i])) for i in order]
+
+
+# Singleton instance
+geo_engine = GeoEngine()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_geo_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        geo_engine.apply(changes)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_geo_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,179 @@
+from typing import List, Tuple
+from sqlalchemy import text, table, column, func, and_, or_, bindparam
+from sqlalchemy.orm import Session, Query
+import models
+from utils.geo import bounding_box, EARTH_RADIUS_KM
+
+hotels_rtree = table(
+    "hotels_rtree",
+    column("id"),
+    column("min_lat"),
+    column("max_lat"),
+    column("min_lon"),
+    column("max_lon"),
+    column("latitude"),
+    column("longitude"),
+    column("hotel_id"),
+)
+
+
+class HotelGeoIndex:
+    """Spatial index over hotel coordinates.
+
+    SQLite uses an R*Tree table (``hotels_rtree``) keyed by ``hotels.rowid``, with
+    the exact coordinates and hotel id kept as auxiliary columns so radius queries
+    can be filtered, ordered and limited without reading the hotels table.
+    Other databases use a B-tree index on (latitude, longitude).
+    """
+
+    def _dialect(self, bind) -> str:
+        return bind.dialect.name
+
+    def ensure_index(self, conn):
+        """Create (and backfill) the spatial index if it does not exist yet"""
+        if self._dialect(conn) == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hotels_rtree'"
+            )).first()
+            if exists:
+                return
+
+            conn.execute(text("""
+                CREATE VIRTUAL TABLE hotels_rtree USING rtree(
+                    id,
+                    min_lat, max_lat,
+                    min_lon, max_lon,
+                    +latitude,
+                    +longitude,
+                    +hotel_id
+                )
+            """))
+            conn.execute(text("""
+                INSERT INTO hotels_rtree (id, min_lat, max_lat, min_lon, max_lon, latitude, longitude, hotel_id)
+                SELECT rowid, latitude, latitude, longitude, longitude, latitude, longitude, id
+                FROM hotels
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            """))
+            conn.commit()
+        else:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hotels_lat_lon ON hotels (latitude, longitude)"))
+            conn.commit()
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        """Insert or refresh a hotel's position (hotel must be flushed)"""
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        self.remove_hotel(db, hotel.id)
+        db.execute(text("""
+            INSERT INTO hotels_rtree (id, min_lat, max_lat, min_lon, max_lon, latitude, longitude, hotel_id)
+            SELECT rowid, latitude, latitude, longitude, longitude, latitude, longitude, id
+            FROM hotels
+            WHERE id = :hotel_id AND latitude IS NOT NULL AND longitude IS NOT NULL
+        """), {"hotel_id": hotel.id})
+
+    def index_hotels(self, db: Session, hotels: List[models.Hotel]):
+        """Batch form of index_hotel for bulk writes"""
+        if self._dialect(db.get_bind()) != "sqlite" or not hotels:
+            return
+
+        hotel_ids = bindparam("hotel_ids", [hotel.id for hotel in hotels], expanding=True)
+        db.execute(text("""
+            DELETE FROM hotels_rtree WHERE id IN (SELECT rowid FROM hotels WHERE id IN :hotel_ids)
+        """).bindparams(hotel_ids))
+        db.execute(text("""
+            INSERT INTO hotels_rtree (id, min_lat, max_lat, min_lon, max_lon, latitude, longitude, hotel_id)
+            SELECT rowid, latitude, latitude, longitude, longitude, latitude, longitude, id
+            FROM hotels
+            WHERE id IN :hotel_ids AND latitude IS NOT NULL AND longitude IS NOT NULL
+        """).bindparams(hotel_ids))
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        """Drop a hotel from the spatial index (call before the hotel row is deleted)"""
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        db.execute(text("""
+            DELETE FROM hotels_rtree WHERE id = (SELECT rowid FROM hotels WHERE id = :hotel_id)
+        """), {"hotel_id": hotel_id})
+
+    def _distance_expression(self, dialect: str, lat: float, lon: float, lat_col, lon_col):
+        if dialect == "sqlite":
+            # Registered on every SQLite connection in database.py
+            return func.haversine_km(lat, lon, lat_col, lon_col)
+
+        dlat = func.radians(lat_col - lat)
+        dlon = func.radians(lon_col - lon)
+        a = func.power(func.sin(dlat / 2), 2) + func.cos(func.radians(lat)) * func.cos(func.radians(lat_col)) * func.power(func.sin(dlon / 2), 2)
+        return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(1.0, a)))
+
+    def within_radius(self, db: Session, lat: float, lon: float, radius_km: float) -> Tuple[Query, object, object]:
+        """
+        Build a query of (hotel_id, distance_km) rows within ``radius_km`` of a point.
+
+        The candidate set comes from the spatial index; the exact distance check is
+        applied in SQL so the caller can ORDER BY / LIMIT in the database.
+
+        Returns:
+            Tuple: (query, hotel id column, distance column)
+        """
+        dialect = self._dialect(db.get_bind())
+        min_lat, max_lat, lon_ranges = bounding_box(lat, lon, radius_km)
+
+        if dialect == "sqlite":
+            lat_col, lon_col, id_col = hotels_rtree.c.latitude, hotels_rtree.c.longitude, hotels_rtree.c.hotel_id
+            box = and_(
+                hotels_rtree.c.max_lat >= min_lat,
+                hotels_rtree.c.min_lat <= max_lat,
+                or_(*[and_(hotels_rtree.c.max_lon >= lo, hotels_rtree.c.min_lon <= hi) for lo, hi in lon_ranges])
+            )
+        else:
+            lat_col, lon_col, id_col = models.Hotel.latitude, models.Hotel.longitude, models.Hotel.id
+            box = and_(
+                lat_col.between(min_lat, max_lat),
+                or_(*[lon_col.between(lo, hi) for lo, hi in lon_ranges])
+            )
+
+        distance = self._distance_expression(dialect, lat, lon, lat_col, lon_col)
+        query = db.query(id_col.label("hotel_id"), distance.label("distance_km")).filter(
+            box,
+            distance <= radius_km
+        )
+        return query, id_col, distance
+
+    def filter_bbox(
+        self,
+        db: Session,
+        query: Query,
+        min_lat: float,
+        max_lat: float,
+        lon_ranges: List[Tuple[float, float]],
+    ) -> Tuple[Query, object, object]:
+        """
+        Restrict a query on Hotel to hotels inside a bounding box, using the spatial index.
+
+        Args:
+            lon_ranges: (min_lon, max_lon) pairs; boxes crossing the antimeridian pass two
+
+        Returns:
+            Tuple: (query, latitude column, longitude column)
+        """
+        if self._dialect(db.get_bind()) == "sqlite":
+            lat_col, lon_col = hotels_rtree.c.latitude, hotels_rtree.c.longitude
+            query = query.join(hotels_rtree, hotels_rtree.c.hotel_id == models.Hotel.id).filter(
+                hotels_rtree.c.max_lat >= min_lat,
+                hotels_rtree.c.min_lat <= max_lat,
+                or_(*[and_(hotels_rtree.c.max_lon >= lo, hotels_rtree.c.min_lon <= hi) for lo, hi in lon_ranges])
+            )
+            return query, lat_col, lon_col
+
+        lat_col, lon_col = models.Hotel.latitude, models.Hotel.longitude
+        query = query.filter(
+            lat_col.between(min_lat, max_lat),
+            or_(*[lon_col.between(lo, hi) for lo, hi in lon_ranges])
+        )
+        return query, lat_col, lon_col
+
+
+# Singleton instance
+hotel_geo_index = HotelGeoIndex()
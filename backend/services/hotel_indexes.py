@@ -0,0 +1,56 @@
+from typing import List
+from sqlalchemy.orm import Session
+import models
+from services.search_service import hotel_search
+from services.trigram_service import hotel_trigram_index
+from services.geo_service import hotel_geo_index
+from services.geo_engine import geo_engine
+from services.deals_service import deal_ranking
+from services.amenity_service import amenity_index
+from services.autocomplete_service import autocomplete_index
+from services.similarity_service import similar_hotels
+
+
+class HotelIndexes:
+    """Keeps every secondary hotel index in step with writes to the hotels table.
+
+    Hotel write routes call ``sync`` after flushing a created/updated hotel and
+    ``remove`` before deleting one, inside the same transaction as the write.
+    Bulk writes call ``sync_many``, which uses an index's ``index_hotels``
+    batch method where it has one.
+    """
+
+    def __init__(self):
+        self.indexes = [hotel_search, hotel_trigram_index, hotel_geo_index, geo_engine, deal_ranking, amenity_index, autocomplete_index, similar_hotels]
+
+    def ensure(self, conn):
+        """Create any missing index structures (used by database.init_database)"""
+        # One at a time, so a failing index (e.g. SQLite built without FTS5 or R*Tree) does not skip the rest
+        for index in self.indexes:
+            try:
+                index.ensure_index(conn)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Failed to create the {type(index).__name__} index: {e}")
+
+    def sync(self, db: Session, hotel: models.Hotel):
+        for index in self.indexes:
+            index.index_hotel(db, hotel)
+
+    def sync_many(self, db: Session, hotels: List[models.Hotel]):
+        for index in self.indexes:
+            index_hotels = getattr(index, "index_hotels", None)
+            if index_hotels:
+                index_hotels(db, hotels)
+            else:
+                for hotel in hotels:
+                    index.index_hotel(db, hotel)
+
+    def remove(self, db: Session, hotel_id: str):
+        for index in self.indexes:
+            index.remove_hotel(db, hotel_id)
+
+
+# Singleton instance
+hotel_indexes = HotelIndexes()
@@ -0,0 +1,237 @@
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+from sqlalchemy import String, cast, event, inspect
+import models
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bounding box (long edge, px) of each derivative; images are never upscaled
+VARIANT_SIZES = {"full": 1920, "card": 800, "thumb": 320}
+
+# Output formats: response key -> (Pillow format, file extension)
+VARIANT_FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+
+UPLOADS_URL_PREFIX = "/uploads/"
+
+MANIFEST_SUFFIX = ".variants.json"
+
+
+def _variant_name(stem: str, size: str, extension: str) -> str:
+    return f"{stem}_{size}{extension}"
+
+
+def generate_variants(path: str, url: str, webp_quality: int, jpeg_quality: int) -> Dict[str, dict]:
+    """
+    Write the resized WebP and JPEG copies of one image next to it, plus a manifest.
+    Runs in a worker process.
+
+    Returns:
+        Dict: size name -> {width, height, webp, jpeg} (URLs)
+    """
+    source = Path(path)
+    stem = source.stem
+    token = uuid.uuid4().hex[:8]  # Jobs for the same file may overlap
+    base_url = url.rsplit("/", 1)[0]
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)  # First frame only for animations
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for size, bound in VARIANT_SIZES.items():  # Largest first, each size is resized from the previous one
+        if max(image.size) > bound:
+            image = image.copy()
+            image.thumbnail((bound, bound), Image.Resampling.LANCZOS)
+        flattened = None
+        entry = {"width": image.width, "height": image.height}
+        for key, (image_format, extension) in VARIANT_FORMATS.items():
+            output = image
+            if image_format == "JPEG" and image.mode == "RGBA":
+                if flattened is None:
+                    flattened = Image.new("RGB", image.size, (255, 255, 255))
+                    flattened.paste(image, mask=image.getchannel("A"))
+                output = flattened
+            name = _variant_name(stem, size, extension)
+            partial_path = source.with_name(f".{name}.{token}.part")
+            quality = webp_quality if image_format == "WEBP" else jpeg_quality
+            output.save(partial_path, image_format, quality=quality, optimize=image_format == "JPEG", progressive=image_format == "JPEG")
+            os.replace(partial_path, source.with_name(name))
+            entry[key] = f"{base_url}/{name}"
+        variants[size] = entry
+
+    manifest = source.with_name(f"{stem}{MANIFEST_SUFFIX}")
+    partial_manifest = manifest.with_name(f".{manifest.name}.{token}.part")
+    with open(partial_manifest, "w") as f:
+        json.dump(variants, f)
+    os.replace(partial_manifest, manifest)
+    return variants
+
+
+class ImageDerivatives:
+    """Resized WebP/JPEG copies of uploaded hotel images.
+
+    After an upload is saved, a job on a process pool (resizing is CPU-bound)
+    writes thumb, card and full-screen derivatives of the image next to it
+    (``<name>_<size>.webp`` / ``.jpg``, see VARIANT_SIZES) and a small
+    ``<name>.variants.json`` manifest. Hotels expose them in
+    ``image_variants``, keyed by the original image URL, so clients can pick
+    the smallest adequate file. The column is filled from the manifests when
+    a hotel's images are saved, and again when a job finishes for an image a
+    hotel already references.
+
+    ``python -m services.image_service`` generates derivatives for existing
+    hotel images.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("IMAGE_DERIVATIVES_ENABLED", "true").lower() == "true"
+        self.workers = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", 2))
+        self.webp_quality = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+        self.jpeg_quality = int(os.getenv("IMAGE_JPEG_QUALITY", 82))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads, sockets or database connections
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def path_for(self, url: str) -> Optional[Path]:
+        """Local file behind an /uploads URL, or None for other URLs"""
+        if not isinstance(url, str) or not url.startswith(UPLOADS_URL_PREFIX):
+            return None
+        path = Path(url.lstrip("/"))
+        if ".." in path.parts:
+            return None
+        return path
+
+    def url_for(self, path: Path) -> str:
+        return "/" + path.as_posix()
+
+    def manifest(self, url: str) -> Optional[Dict[str, dict]]:
+        """Recorded derivatives of one image, or None if they have not been generated"""
+        path = self.path_for(url)
+        if path is None:
+            return None
+        try:
+            with open(path.with_name(f"{path.stem}{MANIFEST_SUFFIX}")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, images: Optional[List[str]]) -> Optional[Dict[str, Dict[str, dict]]]:
+        """``image_variants`` value for a hotel's images"""
+        variants = {}
+        for url in images or []:
+            manifest = self.manifest(url)
+            if manifest:
+                variants[url] = manifest
+        return variants or None
+
+    def refresh(self, hotel: models.Hotel):
+        hotel.image_variants = self.lookup(hotel.images)
+
+    # Generation
+
+    def submit(self, path: Path) -> Optional[Future]:
+        """Queue derivative generation for a newly saved upload"""
+        if not self.enabled:
+            return None
+        url = self.url_for(path)
+        try:
+            future = self.executor.submit(generate_variants, str(path), url, self.webp_quality, self.jpeg_quality)
+        except RuntimeError as e:  # Pool shut down or broken
+            logger.error(f"Failed to queue image derivatives for {url}: {e}")
+            return None
+        future.add_done_callback(partial(self._attach, url))
+        return future
+
+    def _attach(self, url: str, future: Future):
+        """Record finished derivatives on the hotels that already reference the image"""
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Image derivatives failed for {url}: {error}")
+            return
+
+        from database import SessionLocal
+        from services.cache_service import response_cache
+        from services.media_service import media_store
+
+        db = SessionLocal()
+        try:
+            # Usually no hotel references a fresh upload yet; saving one later reads the manifest
+            sha256 = media_store.sha256_of(url)
+            if sha256 is not None:
+                media = db.get(models.MediaObject, sha256)
+                if media is None or media.ref_count <= 0:
+                    return
+            hotels = db.query(models.Hotel).filter(cast(models.Hotel.images, String).contains(json.dumps(url))).all()
+            hotels = [hotel for hotel in hotels if url in (hotel.images or [])]
+            if hotels:
+                for hotel in hotels:
+                    self.refresh(hotel)
+                response_cache.invalidate(db, "hotels")
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to record image derivatives for {url}: {e}")
+        finally:
+            db.close()
+
+
+# Singleton instance
+image_derivatives = ImageDerivatives()
+
+
+@event.listens_for(models.Hotel, "before_insert")
+def _image_variants_on_insert(mapper, connection, hotel):
+    image_derivatives.refresh(hotel)
+
+
+@event.listens_for(models.Hotel, "before_update")
+def _image_variants_on_update(mapper, connection, hotel):
+    if inspect(hotel).attrs.images.history.has_changes():
+        image_derivatives.refresh(hotel)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, init_database
+
+    init_database()
+    session = SessionLocal()
+    try:
+        hotels = session.query(models.Hotel).filter(models.Hotel.images.isnot(None)).all()
+        pending = {}
+        for hotel in hotels:
+            for url in hotel.images or []:
+                path = image_derivatives.path_for(url)
+                if path is not None and path.exists() and url not in pending and image_derivatives.manifest(url) is None:
+                    pending[url] = image_derivatives.executor.submit(
+                        generate_variants, str(path), url, image_derivatives.webp_quality, image_derivatives.jpeg_quality
+                    )
+        for url, future in pending.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Image derivatives failed for {url}: {e}")
+        for hotel in hotels:
+            image_derivatives.refresh(hotel)
+        session.commit()
+        print(f"Generated derivatives for {len(pending)} images across {len(hotels)} hotels")
+    finally:
+        session.close()
+        if image_derivatives._executor is not None:
+            image_derivatives._executor.shutdown()
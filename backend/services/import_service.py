@@ -0,0 +1,181 @@
+import codecs
+import csv
+import json
+import os
+import uuid
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+import models
+import schemas
+from services.cache_service import response_cache
+from services.deals_service import deal_ranking
+from services.hotel_indexes import hotel_indexes
+from services.image_service import image_derivatives
+from services.media_service import media_store
+
+load_dotenv()
+
+FORMATS = ("ndjson", "csv")
+
+# CSV cells holding lists: "wifi|pool" or a JSON array
+LIST_COLUMNS = ("amenities", "images")
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class HotelImporter:
+    """Bulk hotel import for chain onboarding.
+
+    The upload is read row by row (NDJSON lines or CSV records) straight from
+    the spooled upload file and each row is validated with ``HotelCreate``.
+    Valid rows are inserted HOTEL_IMPORT_BATCH_SIZE at a time with a single
+    executemany INSERT, their secondary indexes are synced and the batch is
+    committed, so memory stays bounded by the batch size whatever the file
+    size. Invalid rows are skipped and reported by line number. When a batch
+    INSERT fails, its rows are retried one per transaction, so only the rows
+    the database rejects are reported, each with its own error.
+    """
+
+    def __init__(self):
+        self.batch_size = int(os.getenv("HOTEL_IMPORT_BATCH_SIZE", 500))
+
+    def detect_format(self, filename: Optional[str], content_type: Optional[str], fmt: Optional[str]) -> str:
+        if fmt:
+            fmt = fmt.lower()
+        elif (filename and filename.lower().endswith(".csv")) or content_type in ("text/csv", "application/csv"):
+            fmt = "csv"
+        elif (filename and filename.lower().endswith((".ndjson", ".jsonl"))) or content_type in ("application/x-ndjson", "application/jsonl"):
+            fmt = "ndjson"
+
+        if fmt not in FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported import format. Available: {', '.join(FORMATS)}"
+            )
+        return fmt
+
+    # Parsing
+
+    def _list_cell(self, value: str) -> List[str]:
+        if value.startswith("["):
+            return json.loads(value)
+        return [item.strip() for item in value.split("|") if item.strip()]
+
+    def _csv_rows(self, text) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+        reader = csv.DictReader(text)
+        for record in reader:
+            row_number = reader.line_num  # Line of the file, the header being line 1
+            try:
+                data = {}
+                for key, value in record.items():
+                    if key is None or value is None or not value.strip():
+                        continue  # Extra cells or empty values (so field defaults apply)
+                    key = key.strip()
+                    data[key] = self._list_cell(value.strip()) if key in LIST_COLUMNS else value.strip()
+            except ValueError as e:
+                yield row_number, None, f"Invalid list value: {e}"
+                continue
+            yield row_number, data, None
+
+    def _ndjson_rows(self, text) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield row_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row_number, None, "Each line must be a JSON object"
+                continue
+            yield row_number, data, None
+
+    def rows(self, file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[schemas.HotelCreate], List[str]]]:
+        """Yield (line number, validated hotel or None, errors) for each record of the upload"""
+        text = codecs.getreader("utf-8-sig")(file, errors="replace")
+        records = self._csv_rows(text) if fmt == "csv" else self._ndjson_rows(text)
+        for row_number, data, error in records:
+            if error:
+                yield row_number, None, [error]
+                continue
+            try:
+                hotel = schemas.HotelCreate(**data)
+            except ValidationError as e:
+                yield row_number, None, [
+                    f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+                ]
+                continue
+            if hotel.images and len(hotel.images) > 10:
+                yield row_number, None, ["Maximum 10 images allowed per hotel"]
+                continue
+            yield row_number, hotel, []
+
+    # Writing
+
+    def _insert_batch(self, db: Session, owner_id: str, batch: List[schemas.HotelCreate]):
+        hotels = []
+        for hotel in batch:
+            db_hotel = models.Hotel(id=str(uuid.uuid4()), owner_id=owner_id, available_rooms=hotel.total_rooms, **hotel.dict())
+            deal_ranking.refresh(db_hotel)  # Mapper hooks do not run for Core inserts
+            image_derivatives.refresh(db_hotel)
+            hotels.append(db_hotel)
+
+        columns = list(schemas.HotelCreate.model_fields) + ["id", "owner_id", "available_rooms", "effective_price_per_night", "deal_score", "image_variants"]
+        db.execute(insert(models.Hotel), [{column: getattr(hotel, column) for column in columns} for hotel in hotels])
+
+        # The hotels are transient; the indexes only read their id and indexed fields
+        hotel_indexes.sync_many(db, hotels)
+        media_store.add_references(db.connection(), hotels)
+        response_cache.invalidate(db, "hotels")
+        db.commit()
+
+    def run(self, db: Session, owner_id: str, file: BinaryIO, fmt: str) -> dict:
+        total = imported = failed = 0
+        errors = []
+        batch: List[schemas.HotelCreate] = []
+        batch_rows: List[int] = []
+
+        def flush():
+            nonlocal imported, failed
+            try:
+                self._insert_batch(db, owner_id, batch)
+                imported += len(batch)
+            except Exception:
+                db.rollback()
+                # Find the offending rows by inserting the batch one row at a time
+                for hotel, row_number in zip(batch, batch_rows):
+                    try:
+                        self._insert_batch(db, owner_id, [hotel])
+                        imported += 1
+                    except Exception as e:
+                        db.rollback()
+                        failed += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append({"row": row_number, "errors": [f"Insert failed: {getattr(e, 'orig', e)}"]})
+            batch.clear()
+            batch_rows.clear()
+
+        for row_number, hotel, row_errors in self.rows(file, fmt):
+            total += 1
+            if hotel is None:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row_number, "errors": row_errors})
+                continue
+            batch.append(hotel)
+            batch_rows.append(row_number)
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        return {"total_rows": total, "imported": imported, "failed": failed, "errors": errors}
+
+
+# Singleton instance
+hotel_importer = HotelImporter()
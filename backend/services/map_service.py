@@ -0,0 +1,131 @@
+import os
+from typing import List, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from sqlalchemy import cast, func, literal_column, Integer
+from sqlalchemy.orm import Session
+import models
+from services.geo_service import hotel_geo_index
+
+load_dotenv()
+
+
+class HotelMapService:
+    """Viewport queries for the map screen.
+
+    Hotels inside the bounding box (found through the spatial index) are
+    grouped into a fixed grid of square cells in SQL, returning per cell the
+    hotel count, centroid and lowest nightly price. The grid is anchored at
+    (-90, -180) so clusters stay put while the user pans. Cells shrink as the
+    zoom grows; from MAP_PIN_ZOOM on, individual pins are returned instead,
+    as long as the viewport holds at most MAP_MAX_PINS hotels. Either way the
+    payload is bounded regardless of how many hotels are in view.
+    """
+
+    def __init__(self):
+        self.pin_zoom = int(os.getenv("MAP_PIN_ZOOM", 15))
+        self.max_pins = int(os.getenv("MAP_MAX_PINS", 300))
+        self.max_clusters = int(os.getenv("MAP_MAX_CLUSTERS", 512))
+        self.cells_per_tile = 4  # Grid cells per 256px map tile edge
+
+    def parse_bbox(self, bbox: str) -> Tuple[float, float, List[Tuple[float, float]]]:
+        """
+        Parse "min_lon,min_lat,max_lon,max_lat". A box with min_lon > max_lon crosses the antimeridian.
+
+        Returns:
+            Tuple: (min_lat, max_lat, [(min_lon, max_lon), ...])
+        """
+        try:
+            min_lon, min_lat, max_lon, max_lat = [float(value) for value in bbox.split(",")]
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="bbox must be min_lon,min_lat,max_lon,max_lat"
+            )
+
+        if not (-90 <= min_lat <= max_lat <= 90) or not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid bbox")
+
+        if min_lon > max_lon:
+            return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon)]
+        return min_lat, max_lat, [(min_lon, max_lon)]
+
+    def cell_size(self, zoom: int, min_lat: float, max_lat: float, lon_ranges: List[Tuple[float, float]]) -> float:
+        """Grid cell edge in degrees for a zoom level, widened if the box would need too many cells"""
+        cell = 360.0 / (2 ** zoom) / self.cells_per_tile
+        lat_span = max_lat - min_lat
+        lon_span = sum(hi - lo for lo, hi in lon_ranges)
+        while (lat_span / cell + 1) * (lon_span / cell + len(lon_ranges)) > self.max_clusters:
+            cell *= 2
+        return cell
+
+    def viewport(self, db: Session, bbox: str, zoom: int) -> dict:
+        min_lat, max_lat, lon_ranges = self.parse_bbox(bbox)
+        query, lat_col, lon_col = hotel_geo_index.filter_bbox(db, db.query(models.Hotel), min_lat, max_lat, lon_ranges)
+
+        if zoom >= self.pin_zoom:
+            rows = query.with_entities(
+                models.Hotel.id,
+                models.Hotel.name,
+                lat_col,
+                lon_col,
+                models.Hotel.effective_price_per_night,
+                models.Hotel.rating,
+                models.Hotel.is_deal
+            ).limit(self.max_pins + 1).all()
+
+            if len(rows) <= self.max_pins:
+                pins = [
+                    {
+                        "hotel_id": hotel_id,
+                        "name": name,
+                        "latitude": latitude,
+                        "longitude": longitude,
+                        "price": price,
+                        "rating": rating,
+                        "is_deal": bool(is_deal),
+                    }
+                    for hotel_id, name, latitude, longitude, price, rating, is_deal in rows
+                ]
+                return {"zoom": zoom, "cell_size": None, "total": len(pins), "clusters": [], "pins": pins}
+
+        cell = self.cell_size(zoom, min_lat, max_lat, lon_ranges)
+        # Render the cell size inline so SELECT and GROUP BY are the same expression
+        cell_literal = literal_column(repr(cell))
+        if db.get_bind().dialect.name == "sqlite":
+            # Offsets keep values positive, so truncation is floor
+            cell_row = cast((lat_col + 90.0) / cell_literal, Integer)
+            cell_col = cast((lon_col + 180.0) / cell_literal, Integer)
+        else:
+            cell_row = func.floor((lat_col + 90.0) / cell_literal)
+            cell_col = func.floor((lon_col + 180.0) / cell_literal)
+
+        rows = query.with_entities(
+            func.count(models.Hotel.id),
+            func.avg(lat_col),
+            func.avg(lon_col),
+            func.min(models.Hotel.effective_price_per_night),
+            func.min(models.Hotel.id)
+        ).group_by(cell_row, cell_col).all()
+
+        clusters = [
+            {
+                "latitude": latitude,
+                "longitude": longitude,
+                "count": count,
+                "min_price": min_price,
+                "hotel_id": hotel_id if count == 1 else None,
+            }
+            for count, latitude, longitude, min_price, hotel_id in rows
+        ]
+        return {
+            "zoom": zoom,
+            "cell_size": cell,
+            "total": sum(cluster["count"] for cluster in clusters),
+            "clusters": clusters,
+            "pins": [],
+        }
+
+
+# Singleton instance
+hotel_map = HotelMapService()
@@ -0,0 +1,128 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import PurePosixPath
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+load_dotenv()
+
+# Content-addressed files (services/media_service.py) and their resized variants, relative to /uploads
+IMMUTABLE_PATH_PATTERN = re.compile(r"^media/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(_[a-z]+)?\.[a-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class MediaMemoryCache:
+    """Byte-capped LRU of small file bodies, keyed by (path, mtime, size) so changed files miss"""
+
+    def __init__(self, max_bytes: int, max_file_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._entries: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def accepts(self, size: int) -> bool:
+        return self.max_bytes > 0 and size <= min(self.max_file_bytes, self.max_bytes)
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def load(self, key: Tuple[str, int, int]):
+        """Read a file into the cache (runs as a background task after the file was served)"""
+        try:
+            with open(key[0], "rb") as f:
+                content = f.read(self.max_file_bytes + 1)
+        except OSError:
+            return
+        if len(content) != key[2]:
+            return  # Changed since it was served
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = content
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+class MediaFiles(StaticFiles):
+    """Static file serving for /uploads with client caching.
+
+    Content-addressed media URLs never change their bytes, so they are sent
+    with a one-year ``immutable`` Cache-Control and, for originals, the
+    SHA-256 itself as a strong ETag; other uploads get MEDIA_MAX_AGE and are
+    revalidated with their stat-based ETag. Range requests, If-Range and
+    conditional requests are handled by Starlette's FileResponse, which also
+    uses the server's zero-copy ``http.response.pathsend`` extension where
+    available. Small files (thumbnails) are additionally kept in a byte-capped
+    in-memory LRU (MEDIA_MEMORY_CACHE_BYTES, files up to
+    MEDIA_MEMORY_CACHE_MAX_FILE_BYTES) and served without touching the disk.
+    Dotfiles (partial uploads, temporary files) are never served.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = int(os.getenv("MEDIA_MAX_AGE", 86400))
+        self.memory_cache = MediaMemoryCache(
+            int(os.getenv("MEDIA_MEMORY_CACHE_BYTES", 32 * 1024 * 1024)),
+            int(os.getenv("MEDIA_MEMORY_CACHE_MAX_FILE_BYTES", 64 * 1024))
+        )
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in PurePosixPath(path.replace(os.sep, "/")).parts):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def cache_headers(self, full_path) -> dict:
+        path = os.path.relpath(os.path.realpath(full_path), os.path.realpath(self.directory)).replace(os.sep, "/")
+        match = IMMUTABLE_PATH_PATTERN.match(path)
+        if match is None:
+            return {"cache-control": f"public, max-age={self.max_age}"}
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL}
+        if match.group(2) is None:
+            headers["etag"] = f'"{match.group(1)}"'  # Originals: the content hash
+        return headers
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=self.cache_headers(full_path),
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if scope["method"] != "GET" or "range" in request_headers or not self.memory_cache.accepts(stat_result.st_size):
+            return response
+
+        key = (str(full_path), stat_result.st_mtime_ns, stat_result.st_size)
+        content = self.memory_cache.get(key)
+        if content is None:
+            response.background = BackgroundTask(self.memory_cache.load, key)
+            return response
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        return Response(content, status_code=status_code, headers=headers)
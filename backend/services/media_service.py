@@ -0,0 +1,230 @@
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import event, func, inspect, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import models
+
+load_dotenv()
+
+# Served by the /uploads static mount
+MEDIA_ROOT = Path("uploads/media")
+
+MEDIA_URL_PATTERN = re.compile(r"^/uploads/media/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$")
+
+
+class MediaStore:
+    """Content-addressed store for uploaded hotel images.
+
+    Each file is named by the SHA-256 of its bytes
+    (``uploads/media/ab/cd/<sha256>.<ext>``), so uploading the same photo
+    twice, or using it for several hotels, stores it once. Because the bytes
+    behind a URL never change, clients may cache these URLs forever.
+
+    A ``media_objects`` row per file counts the hotels whose ``images``
+    reference it. Mapper hooks keep ``ref_count`` in step with hotel
+    inserts, image edits and deletes. ``collect`` removes files (and their
+    derivatives) that have been unreferenced for MEDIA_GC_GRACE_SECONDS,
+    which leaves new uploads time to be attached to a hotel. Run it with
+    ``python -m services.media_service``, which also repairs the counts.
+    """
+
+    def __init__(self):
+        self.root = MEDIA_ROOT
+        self.grace_seconds = int(os.getenv("MEDIA_GC_GRACE_SECONDS", 86400))
+
+    # Layout
+
+    def path_for(self, sha256: str, extension: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{extension}"
+
+    def url_for(self, path: Path) -> str:
+        return "/" + path.as_posix()
+
+    def sha256_of(self, url: str) -> Optional[str]:
+        """Content hash behind a media URL, or None for other URLs"""
+        match = MEDIA_URL_PATTERN.match(url) if isinstance(url, str) else None
+        return match.group(1) if match else None
+
+    def partial_path(self) -> Path:
+        """Temporary file to stream an upload into before its hash is known"""
+        directory = self.root / ".partial"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{uuid.uuid4().hex}.part"
+
+    def put(self, partial: Path, sha256: str, extension: str) -> Path:
+        """
+        Move a fully written upload to its content address, dropping it if the content is already stored.
+
+        The ``media_objects`` row is recorded (or, if unreferenced, its grace period restarted) first, in its own
+        transaction. ``collect`` claims a row and deletes its files inside one transaction, so this either stops
+        the collection or waits for it to finish and then finds the file gone and writes it again.
+        """
+        self._lease(sha256, extension, partial.stat().st_size)
+        path = self.path_for(sha256, extension)
+        if path.exists():
+            partial.unlink(missing_ok=True)
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partial, path)  # A concurrent upload of the same bytes writes the same file
+        return path
+
+    # Reference counting
+
+    def _lease(self, sha256: str, extension: str, size: int):
+        """Record a stored object (new rows start unreferenced) and restart the grace period of an unreferenced one"""
+        from database import SessionLocal
+
+        table = models.MediaObject.__table__
+        db = SessionLocal()
+        try:
+            refreshed = db.execute(
+                update(table).where(table.c.sha256 == sha256, table.c.ref_count <= 0).values(updated_at=func.now())
+            ).rowcount
+            if not refreshed and db.get(models.MediaObject, sha256) is None:
+                db.add(models.MediaObject(sha256=sha256, extension=extension, size=size, ref_count=0))
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # Recorded by a concurrent upload of the same bytes
+        finally:
+            db.close()
+
+    def references(self, images: Optional[List[str]]) -> set:
+        """Media hashes a hotel's images reference (once each, however often listed)"""
+        return {sha256 for sha256 in map(self.sha256_of, images or []) if sha256}
+
+    def adjust(self, connection, deltas: Dict[str, int]):
+        """Apply reference count changes inside the current flush"""
+        table = models.MediaObject.__table__
+        by_delta: Dict[int, List[str]] = {}
+        for sha256, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(sha256)
+        for delta, hashes in by_delta.items():
+            connection.execute(
+                update(table).where(table.c.sha256.in_(hashes)).values(
+                    ref_count=table.c.ref_count + delta,
+                    updated_at=func.now()
+                )
+            )
+
+    def add_references(self, connection, hotels: Iterable[models.Hotel]):
+        """Count the images of hotels inserted without mapper hooks (Core bulk inserts)"""
+        counts = Counter(sha256 for hotel in hotels for sha256 in self.references(hotel.images))
+        self.adjust(connection, counts)
+
+    def recount(self, db: Session) -> int:
+        """Recompute every reference count from the hotels table. Returns the number of counts corrected."""
+        counts = Counter()
+        for (images,) in db.query(models.Hotel.images).filter(models.Hotel.images.isnot(None)).yield_per(1000):
+            counts.update(self.references(images))
+
+        corrected = 0
+        for media in db.query(models.MediaObject).all():
+            if media.ref_count != counts.get(media.sha256, 0):
+                media.ref_count = counts.get(media.sha256, 0)
+                media.updated_at = func.now()
+                corrected += 1
+        db.commit()
+        return corrected
+
+    # Garbage collection
+
+    def _remove_files(self, sha256: str, extension: str):
+        path = self.path_for(sha256, extension)
+        # The original, its resized variants and their manifest
+        for file in path.parent.glob(f"{sha256}*"):
+            file.unlink(missing_ok=True)
+        for directory in (path.parent, path.parent.parent):
+            try:
+                directory.rmdir()
+            except OSError:
+                break  # Not empty
+
+    def collect(self, db: Session, grace_seconds: Optional[int] = None) -> int:
+        """Delete objects unreferenced for longer than the grace period. Returns the number deleted."""
+        grace_seconds = self.grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        orphans = db.query(models.MediaObject.sha256, models.MediaObject.extension).filter(
+            models.MediaObject.ref_count <= 0,
+            models.MediaObject.updated_at <= cutoff
+        ).all()
+
+        collected = 0
+        for sha256, extension in orphans:
+            # Claim the row first, so an object referenced or uploaded again meanwhile is kept
+            claimed = db.execute(
+                models.MediaObject.__table__.delete().where(
+                    models.MediaObject.sha256 == sha256,
+                    models.MediaObject.ref_count <= 0,
+                    models.MediaObject.updated_at <= cutoff
+                )
+            ).rowcount
+            if claimed:
+                # Before committing, so a concurrent put() of the same bytes waits and then writes the file again
+                self._remove_files(sha256, extension)
+                collected += 1
+            db.commit()
+
+        # Partial uploads left behind by crashed writers
+        partial_dir = self.root / ".partial"
+        if partial_dir.exists():
+            for partial in partial_dir.iterdir():
+                try:
+                    if time.time() - partial.stat().st_mtime > max(grace_seconds, 3600):
+                        partial.unlink()
+                except OSError:
+                    pass
+        return collected
+
+
+# Singleton instance
+media_store = MediaStore()
+
+
+@event.listens_for(models.Hotel, "after_insert")
+def _count_media_on_insert(mapper, connection, hotel):
+    media_store.adjust(connection, Counter(media_store.references(hotel.images)))
+
+
+@event.listens_for(models.Hotel.images, "set", active_history=True)
+def _load_replaced_images(hotel, value, oldvalue, initiator):
+    # active_history loads the replaced list even when it was expired, so the update below can release it
+    pass
+
+
+@event.listens_for(models.Hotel, "after_update")
+def _count_media_on_update(mapper, connection, hotel):
+    history = inspect(hotel).attrs.images.history
+    if not history.has_changes():
+        return
+    old = media_store.references(history.deleted[0] if history.deleted else None)
+    new = media_store.references(hotel.images)
+    deltas = Counter(new - old)
+    deltas.subtract(Counter(old - new))
+    media_store.adjust(connection, deltas)
+
+
+@event.listens_for(models.Hotel, "after_delete")
+def _count_media_on_delete(mapper, connection, hotel):
+    media_store.adjust(connection, {sha256: -1 for sha256 in media_store.references(hotel.images)})
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, init_database
+
+    init_database()
+    session = SessionLocal()
+    try:
+        corrected = media_store.recount(session)
+        collected = media_store.collect(session)
+        print(f"Corrected {corrected} reference counts, collected {collected} unreferenced media objects")
+    finally:
+        session.close()
@@ -0,0 +1,79 @@
+from typing import List, Optional
+from sqlalchemy import func, desc, asc
+from sqlalchemy.orm import Session, joinedload
+import models
+
+
+class HotelReviews:
+    """Review pages and rating summaries shared by the reviews and hotel detail endpoints"""
+
+    def page_query(self, db: Session, hotel_id: str, sort_by: str = "newest", rating_filter: Optional[int] = None):
+        query = db.query(models.Review).options(
+            joinedload(models.Review.user)
+        ).filter(models.Review.hotel_id == hotel_id)
+
+        # Apply rating filter
+        if rating_filter is not None:
+            query = query.filter(models.Review.rating == rating_filter)
+
+        # Apply sorting
+        if sort_by == "oldest":
+            return query.order_by(asc(models.Review.created_at))
+        if sort_by == "rating_high":
+            return query.order_by(desc(models.Review.rating), desc(models.Review.created_at))
+        if sort_by == "rating_low":
+            return query.order_by(asc(models.Review.rating), desc(models.Review.created_at))
+        return query.order_by(desc(models.Review.created_at))
+
+    def format(self, reviews: List[models.Review]) -> List[dict]:
+        return [
+            {
+                "id": review.id,
+                "rating": review.rating,
+                "comment": review.comment,
+                "owner_reply": review.owner_reply,
+                "created_at": review.created_at.isoformat(),
+                "user": {
+                    "id": review.user.id,
+                    "full_name": review.user.full_name,
+                    "profile_image": review.user.profile_image
+                },
+                "booking_id": review.booking_id
+            }
+            for review in reviews
+        ]
+
+    def summary(self, db: Session, hotel_id: str) -> dict:
+        """Average rating, review count and 1-5 distribution from a single grouped query"""
+        rows = db.query(
+            models.Review.rating,
+            func.count(models.Review.id)
+        ).filter(models.Review.hotel_id == hotel_id).group_by(models.Review.rating).all()
+
+        rating_distribution = {i: 0 for i in range(1, 6)}
+        total = 0
+        rating_sum = 0
+        for rating, count in rows:
+            rating_distribution[rating] = count
+            total += count
+            rating_sum += rating * count
+
+        return {
+            "average_rating": round(rating_sum / total, 1) if total else 0.0,
+            "total_reviews": total,
+            "rating_distribution": rating_distribution
+        }
+
+    def pagination(self, page: int, limit: int, total: int) -> dict:
+        return {
+            "current_page": page,
+            "total_pages": (total + limit - 1) // limit,
+            "total_reviews": total,
+            "limit": limit,
+            "has_next": page * limit < total,
+            "has_prev": page > 1
+        }
+
+
+# Singleton instance
+hotel_reviews = HotelReviews()
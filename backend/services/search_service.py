@@ -0,0 +1,135 @@
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import text, table, column, literal_column, func, false, bindparam
+from sqlalchemy.orm import Session, Query
+import models
+
+# Column weights for BM25 ranking: hotel_id (unindexed), name, city, country, description
+_BM25_WEIGHTS = "0.0, 10.0, 5.0, 5.0, 1.0"
+
+# Document expression used by the Postgres GIN index. Queries must use the exact
+# same expression for the planner to pick the index.
+_PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(hotels.name, '') || ' ' || coalesce(hotels.city, '') || ' ' || "
+    "coalesce(hotels.country, '') || ' ' || coalesce(hotels.description, ''))"
+)
+
+hotels_fts = table("hotels_fts", column("rowid"), column("hotel_id"))
+
+
+class HotelSearchService:
+    """Full-text search over hotel name, city, country and description.
+
+    SQLite uses an FTS5 virtual table (``hotels_fts``) whose rowid mirrors
+    ``hotels.rowid``; it is kept in sync explicitly by the hotel write routes.
+    Postgres uses a GIN index over a tsvector expression, which the database
+    maintains by itself.
+    """
+
+    def _dialect(self, bind) -> str:
+        return bind.dialect.name
+
+    def ensure_index(self, conn):
+        """Create (and backfill) the search index if it does not exist yet"""
+        if self._dialect(conn) == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hotels_fts'"
+            )).first()
+            if exists:
+                return
+
+            conn.execute(text("""
+                CREATE VIRTUAL TABLE hotels_fts USING fts5(
+                    hotel_id UNINDEXED,
+                    name,
+                    city,
+                    country,
+                    description,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """))
+            conn.execute(text("""
+                INSERT INTO hotels_fts (rowid, hotel_id, name, city, country, description)
+                SELECT rowid, id, name, city, country, description FROM hotels
+            """))
+            conn.commit()
+        elif self._dialect(conn) == "postgresql":
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_hotels_search ON hotels USING GIN (({_PG_DOCUMENT}))"))
+            conn.commit()
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        """Insert or refresh a hotel in the search index (hotel must be flushed)"""
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        self.remove_hotel(db, hotel.id)
+        db.execute(text("""
+            INSERT INTO hotels_fts (rowid, hotel_id, name, city, country, description)
+            SELECT rowid, id, name, city, country, description FROM hotels WHERE id = :hotel_id
+        """), {"hotel_id": hotel.id})
+
+    def index_hotels(self, db: Session, hotels: List[models.Hotel]):
+        """Batch form of index_hotel for bulk writes"""
+        if self._dialect(db.get_bind()) != "sqlite" or not hotels:
+            return
+
+        hotel_ids = bindparam("hotel_ids", [hotel.id for hotel in hotels], expanding=True)
+        db.execute(text("""
+            DELETE FROM hotels_fts WHERE rowid IN (SELECT rowid FROM hotels WHERE id IN :hotel_ids)
+        """).bindparams(hotel_ids))
+        db.execute(text("""
+            INSERT INTO hotels_fts (rowid, hotel_id, name, city, country, description)
+            SELECT rowid, id, name, city, country, description FROM hotels WHERE id IN :hotel_ids
+        """).bindparams(hotel_ids))
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        """Drop a hotel from the search index (call before the hotel row is deleted)"""
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        db.execute(text("""
+            DELETE FROM hotels_fts WHERE rowid = (SELECT rowid FROM hotels WHERE id = :hotel_id)
+        """), {"hotel_id": hotel_id})
+
+    def _tokens(self, q: str):
+        return re.findall(r"\w+", q.lower())
+
+    def build_match_query(self, q: str) -> Optional[str]:
+        """Turn free user input into a safe FTS5 MATCH expression (prefix match on every term)"""
+        tokens = self._tokens(q)
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def _build_tsquery(self, q: str) -> Optional[str]:
+        tokens = self._tokens(q)
+        if not tokens:
+            return None
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def filter_query(self, db: Session, query: Query, q: str) -> Tuple[Query, Optional[object]]:
+        """
+        Restrict a query on Hotel to full-text matches for ``q``.
+        Returns the filtered query and a rank expression where ascending order is best match first.
+        """
+        if self._dialect(db.get_bind()) == "postgresql":
+            tsquery = self._build_tsquery(q)
+            if tsquery is None:
+                return query.filter(false()), None
+            document = literal_column(_PG_DOCUMENT)
+            ts_query = func.to_tsquery("simple", tsquery)
+            query = query.filter(document.op("@@")(ts_query))
+            return query, -func.ts_rank_cd(document, ts_query)
+
+        match = self.build_match_query(q)
+        if match is None:
+            return query.filter(false()), None
+
+        query = query.join(hotels_fts, hotels_fts.c.hotel_id == models.Hotel.id).filter(
+            literal_column("hotels_fts").op("MATCH")(match)
+        )
+        return query, literal_column(f"bm25(hotels_fts, {_BM25_WEIGHTS})")
+
+
+# Singleton instance
+hotel_search = HotelSearchService()
@@ -0,0 +1,217 @@
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.orm import Session
+import models
+from services.cache_service import response_cache
+
+load_dotenv()
+
+# Relative weight of each feature block in the distance between two hotels
+FEATURE_WEIGHTS = {
+    "price": 1.5,
+    "star_rating": 1.0,
+    "rating": 1.0,
+    "amenities": 1.0,
+    "property_type": 0.75,
+    "location": 1.0,
+}
+
+# Distance (km) between two hotels that counts as much as one unit of the other features
+LOCATION_SCALE_KM = 50.0
+
+# Amenity vocabulary size (most common amenities only)
+MAX_AMENITIES = 64
+
+# Upper bound on the floats in one block of the pairwise distance computation
+_BLOCK_FLOATS = 2 ** 23
+
+
+class SimilarHotels:
+    """Precomputed "similar hotels" recommendations.
+
+    A batch job turns every hotel into a feature vector (log price, star
+    rating, guest rating, amenity set, property type and position on the unit
+    sphere, each block weighted by FEATURE_WEIGHTS), stacks them into one
+    NumPy matrix and finds each hotel's SIMILAR_HOTELS_K nearest neighbours
+    by Euclidean distance, block by block with ``argpartition``. The results
+    are written to ``hotel_similarities`` so serving is a single primary-key
+    range lookup.
+
+    The job only runs from ``python -m services.similarity_service``
+    (schedule it, e.g. nightly); requests never compute neighbours. It
+    replaces the table in a single transaction, so readers see either the
+    previous or the new neighbours, never a partial set. Hotels created since
+    the last run fall back to well-rated hotels in the same city.
+    """
+
+    def __init__(self):
+        self.k = int(os.getenv("SIMILAR_HOTELS_K", 20))
+
+    # Index interface used by HotelIndexes (new and updated hotels are picked
+    # up by the next batch run; deleted hotels must not be recommended)
+
+    def ensure_index(self, conn):
+        pass
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        pass
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        table = models.HotelSimilarity.__table__
+        db.execute(delete(table).where(or_(table.c.hotel_id == hotel_id, table.c.similar_hotel_id == hotel_id)))
+
+    # Batch job
+
+    def _standardized(self, values: np.ndarray) -> np.ndarray:
+        """Z-scores clipped to +/-3, with missing values at the mean"""
+        filled = np.where(np.isnan(values), np.nanmean(values) if np.any(~np.isnan(values)) else 0.0, values)
+        std = filled.std()
+        if std == 0:
+            return np.zeros_like(filled)
+        return np.clip((filled - filled.mean()) / std, -3, 3)
+
+    def features(self, rows) -> np.ndarray:
+        """Feature matrix (one row per hotel) for (price, star_rating, rating, amenities, property_type, latitude, longitude) rows"""
+        n = len(rows)
+
+        def column(i):
+            return np.array([np.nan if row[i] is None else float(row[i]) for row in rows], dtype=np.float64)
+
+        blocks = [
+            FEATURE_WEIGHTS["price"] * self._standardized(np.log1p(np.maximum(column(0), 0)))[:, None],
+            FEATURE_WEIGHTS["star_rating"] * self._standardized(column(1))[:, None],
+            FEATURE_WEIGHTS["rating"] * self._standardized(column(2))[:, None],
+        ]
+
+        # Amenity sets as unit-length multi-hot vectors
+        counts = Counter(name for row in rows for name in set(row[3] or []) if isinstance(name, str))
+        vocabulary = {name: i for i, (name, _) in enumerate(counts.most_common(MAX_AMENITIES))}
+        amenities = np.zeros((n, max(len(vocabulary), 1)))
+        for i, row in enumerate(rows):
+            for name in set(row[3] or []):
+                if name in vocabulary:
+                    amenities[i, vocabulary[name]] = 1.0
+        norms = np.linalg.norm(amenities, axis=1, keepdims=True)
+        blocks.append(FEATURE_WEIGHTS["amenities"] * np.divide(amenities, norms, out=np.zeros_like(amenities), where=norms > 0))
+
+        # Property types one-hot, scaled so two different types are FEATURE_WEIGHTS apart
+        types = {name: i for i, name in enumerate(sorted({(row[4] or "Hotel").lower() for row in rows}))}
+        property_types = np.zeros((n, len(types)))
+        property_types[np.arange(n), [types[(row[4] or "Hotel").lower()] for row in rows]] = 1.0
+        blocks.append(FEATURE_WEIGHTS["property_type"] / math.sqrt(2) * property_types)
+
+        # Positions on the unit sphere, so chord length ~ distance / earth radius
+        lat = np.radians(column(5))
+        lon = np.radians(column(6))
+        located = ~(np.isnan(lat) | np.isnan(lon))
+        sphere = np.zeros((n, 3))
+        sphere[located] = np.column_stack([
+            np.cos(lat[located]) * np.cos(lon[located]),
+            np.cos(lat[located]) * np.sin(lon[located]),
+            np.sin(lat[located]),
+        ])
+        blocks.append(FEATURE_WEIGHTS["location"] * 6371.0 / LOCATION_SCALE_KM * sphere)
+
+        return np.hstack(blocks)
+
+    def neighbours(self, matrix: np.ndarray, k: int):
+        """
+        Nearest neighbours of every row.
+
+        Returns:
+            Tuple: (indices, distances), both (n, min(k, n - 1)) arrays ordered nearest first
+        """
+        n = len(matrix)
+        k = min(k, n - 1)
+        if k <= 0:
+            return np.empty((n, 0), dtype=np.int64), np.empty((n, 0), dtype=np.float64)
+
+        matrix = matrix - matrix.mean(axis=0)  # Smaller norms, less cancellation in |a|^2 + |b|^2 - 2ab
+        squared = np.einsum("ij,ij->i", matrix, matrix)
+        indices = np.empty((n, k), dtype=np.int64)
+        distances = np.empty((n, k), dtype=np.float64)
+        block = max(1, _BLOCK_FLOATS // n)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            d2 = squared[start:stop, None] + squared[None, :] - 2 * matrix[start:stop] @ matrix.T
+            d2[np.arange(stop - start), np.arange(start, stop)] = np.inf  # Not your own neighbour
+            top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            top_d2 = np.take_along_axis(d2, top, axis=1)
+            order = np.argsort(top_d2, axis=1, kind="stable")
+            indices[start:stop] = np.take_along_axis(top, order, axis=1)
+            distances[start:stop] = np.sqrt(np.maximum(np.take_along_axis(top_d2, order, axis=1), 0))
+        return indices, distances
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute every hotel's neighbours and replace the stored table in one transaction. Returns the hotel count."""
+        rows = db.query(
+            models.Hotel.id,
+            models.Hotel.effective_price_per_night,
+            models.Hotel.star_rating,
+            models.Hotel.rating,
+            models.Hotel.amenities,
+            models.Hotel.property_type,
+            models.Hotel.latitude,
+            models.Hotel.longitude
+        ).order_by(models.Hotel.id).all()
+
+        hotel_ids = [row[0] for row in rows]
+        indices, distances = self.neighbours(self.features([row[1:] for row in rows]), self.k)
+
+        computed_at = datetime.utcnow()
+        table = models.HotelSimilarity.__table__
+        db.execute(delete(table))
+        values = [
+            {
+                "hotel_id": hotel_id,
+                "rank": rank + 1,
+                "similar_hotel_id": hotel_ids[indices[i, rank]],
+                "score": float(1 / (1 + distances[i, rank])),
+                "computed_at": computed_at,
+            }
+            for i, hotel_id in enumerate(hotel_ids)
+            for rank in range(indices.shape[1])
+        ]
+        for start in range(0, len(values), 5000):
+            db.execute(insert(table), values[start:start + 5000])
+        response_cache.invalidate(db, "similar")
+        db.commit()
+        return len(hotel_ids)
+
+    # Queries
+
+    def similar_query(self, db: Session, hotel_id: str):
+        """Hotels similar to ``hotel_id``, most similar first"""
+        return db.query(models.Hotel).join(
+            models.HotelSimilarity, models.HotelSimilarity.similar_hotel_id == models.Hotel.id
+        ).filter(models.HotelSimilarity.hotel_id == hotel_id).order_by(models.HotelSimilarity.rank)
+
+    def fallback_query(self, db: Session, hotel: models.Hotel):
+        """Best-rated hotels in the same city, for hotels the batch job has not seen yet"""
+        return db.query(models.Hotel).filter(
+            models.Hotel.city == hotel.city,
+            models.Hotel.id != hotel.id
+        ).order_by(models.Hotel.rating.desc(), models.Hotel.id)
+
+
+# Singleton instance
+similar_hotels = SimilarHotels()
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, init_database
+
+    init_database()
+    session = SessionLocal()
+    try:
+        started = time.monotonic()
+        count = similar_hotels.rebuild(session)
+        print(f"Computed similar hotels for {count} hotels in {time.monotonic() - started:.1f}s")
+    finally:
+        session.close()
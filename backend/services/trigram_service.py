@@ -0,0 +1,155 @@
+import re
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import text, table, column, func, literal, or_, false, bindparam
+from sqlalchemy.orm import Session, Query
+import models
+from services.autocomplete_service import normalize
+
+# Minimum similarity for a fuzzy match (same default as pg_trgm)
+SIMILARITY_THRESHOLD = 0.3
+
+hotel_trigrams = table(
+    "hotel_trigrams",
+    column("trigram"),
+    column("hotel_id"),
+    column("term"),
+    column("total"),
+)
+
+
+def trigrams(value: Optional[str]) -> Set[str]:
+    """pg_trgm style trigrams: each word padded with two leading spaces and one trailing space"""
+    grams = set()
+    for word in re.findall(r"\w+", normalize(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class HotelTrigramIndex:
+    """Trigram similarity index over hotel names and cities, for typo-tolerant search.
+
+    SQLite keeps a ``hotel_trigrams`` side table with one row per trigram of
+    every indexed term, where the terms are each name/city word plus the whole
+    name and city. A lookup reads only the postings of the query's trigrams via
+    the primary key and scores each term by Jaccard similarity
+    (shared / (query + term - shared)), so no row is compared by edit distance.
+    Postgres uses pg_trgm ``word_similarity`` with GIN trigram indexes.
+    """
+
+    def _dialect(self, bind) -> str:
+        return bind.dialect.name
+
+    def _terms(self, hotel_name: Optional[str], city: Optional[str]) -> List[Tuple[str, Set[str]]]:
+        terms = {}
+        for value in (hotel_name, city):
+            words = re.findall(r"\w+", normalize(value))
+            for word in words:
+                terms[word] = trigrams(word)
+            if len(words) > 1:
+                terms[" ".join(words)] = trigrams(value)
+        return [(term, grams) for term, grams in terms.items() if grams]
+
+    def _rows(self, hotel_id: str, hotel_name: Optional[str], city: Optional[str]) -> List[dict]:
+        return [
+            {"trigram": gram, "hotel_id": hotel_id, "term": term, "total": len(grams)}
+            for term, grams in self._terms(hotel_name, city)
+            for gram in grams
+        ]
+
+    def ensure_index(self, conn):
+        """Create (and backfill) the trigram index if it does not exist yet"""
+        if self._dialect(conn) == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'hotel_trigrams'"
+            )).first()
+            if exists:
+                return
+
+            conn.execute(text("""
+                CREATE TABLE hotel_trigrams (
+                    trigram TEXT NOT NULL,
+                    hotel_id TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    PRIMARY KEY (trigram, hotel_id, term)
+                ) WITHOUT ROWID
+            """))
+            conn.execute(text("CREATE INDEX idx_hotel_trigrams_hotel ON hotel_trigrams (hotel_id)"))
+            rows = []
+            for hotel_id, hotel_name, city in conn.execute(text("SELECT id, name, city FROM hotels")):
+                rows.extend(self._rows(hotel_id, hotel_name, city))
+            if rows:
+                conn.execute(hotel_trigrams.insert(), rows)
+            conn.commit()
+        elif self._dialect(conn) == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hotels_name_trgm ON hotels USING GIN (lower(name) gin_trgm_ops)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hotels_city_trgm ON hotels USING GIN (lower(city) gin_trgm_ops)"))
+            conn.commit()
+
+    def index_hotel(self, db: Session, hotel: models.Hotel):
+        """Insert or refresh a hotel's trigrams (hotel must be flushed)"""
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        self.remove_hotel(db, hotel.id)
+        rows = self._rows(hotel.id, hotel.name, hotel.city)
+        if rows:
+            db.execute(hotel_trigrams.insert(), rows)
+
+    def index_hotels(self, db: Session, hotels: List[models.Hotel]):
+        """Batch form of index_hotel for bulk writes"""
+        if self._dialect(db.get_bind()) != "sqlite" or not hotels:
+            return
+
+        db.execute(hotel_trigrams.delete().where(hotel_trigrams.c.hotel_id.in_([hotel.id for hotel in hotels])))
+        rows = [row for hotel in hotels for row in self._rows(hotel.id, hotel.name, hotel.city)]
+        if rows:
+            db.execute(hotel_trigrams.insert(), rows)
+
+    def remove_hotel(self, db: Session, hotel_id: str):
+        if self._dialect(db.get_bind()) != "sqlite":
+            return
+
+        db.execute(hotel_trigrams.delete().where(hotel_trigrams.c.hotel_id == hotel_id))
+
+    def filter_query(self, db: Session, query: Query, q: str, threshold: float = SIMILARITY_THRESHOLD) -> Tuple[Query, Optional[object]]:
+        """
+        Restrict a query on Hotel to names/cities similar to ``q``.
+        Returns the filtered query and a rank expression where ascending order is most similar first.
+        """
+        if self._dialect(db.get_bind()) == "postgresql":
+            value = normalize(q)
+            if not value:
+                return query.filter(false()), None
+            name = func.lower(models.Hotel.name)
+            city = func.lower(models.Hotel.city)
+            # "<%" is the index-assisted form of word_similarity(value, column) >= pg_trgm.word_similarity_threshold
+            query = query.filter(or_(literal(value).op("<%")(name), literal(value).op("<%")(city)))
+            return query, -func.greatest(func.word_similarity(value, name), func.word_similarity(value, city))
+
+        grams = trigrams(q)
+        if not grams:
+            return query.filter(false()), None
+
+        # Per (hotel, term) Jaccard similarity over the postings of the query trigrams
+        shared = func.count()
+        per_term = db.query(
+            hotel_trigrams.c.hotel_id.label("hotel_id"),
+            (shared * 1.0 / (len(grams) + hotel_trigrams.c.total - shared)).label("similarity")
+        ).filter(
+            hotel_trigrams.c.trigram.in_(bindparam("grams", list(grams), expanding=True))
+        ).group_by(hotel_trigrams.c.hotel_id, hotel_trigrams.c.term, hotel_trigrams.c.total).subquery()
+
+        best = db.query(
+            per_term.c.hotel_id.label("hotel_id"),
+            func.max(per_term.c.similarity).label("similarity")
+        ).group_by(per_term.c.hotel_id).having(func.max(per_term.c.similarity) >= threshold).subquery()
+
+        query = query.join(best, best.c.hotel_id == models.Hotel.id)
+        return query, -best.c.similarity
+
+
+# Singleton instance
+hotel_trigram_index = HotelTrigramIndex()
@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from services.media_service import media_store
+
+load_dotenv()
+
+# Leading bytes identifying each supported image format, keyed by canonical extension
+IMAGE_SIGNATURES = {
+    ".jpg": (b"\xff\xd8\xff",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".gif": (b"GIF87a", b"GIF89a"),
+    ".bmp": (b"BM",),
+}
+
+# Extensions accepted as another name for a canonical one
+EXTENSION_ALIASES = {".jpeg": ".jpg", ".jpe": ".jpg"}
+
+
+class ImageUploader:
+    """Writes uploaded images to disk without blocking the event loop.
+
+    Each file is copied from its spooled upload in UPLOAD_CHUNK_SIZE chunks
+    inside the thread pool, so a multi-megabyte write never runs on the
+    event loop. The first chunk is sniffed for a known image signature (the
+    client's content type and filename are not trusted) and the copy stops
+    as soon as MAX_FILE_SIZE is exceeded. Files are hashed as they are
+    written to a temporary name, then moved into the content-addressed media
+    store (or dropped if it already holds the same bytes), so a rejected or
+    failed upload never leaves a partial image behind. The files of a
+    multi-image upload are written concurrently.
+    """
+
+    def __init__(self):
+        self.max_file_size = int(os.getenv("MAX_FILE_SIZE", 5 * 1024 * 1024))
+        self.max_files = int(os.getenv("MAX_FILES_PER_UPLOAD", 10))
+        self.chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+        extensions = os.getenv("ALLOWED_EXTENSIONS", ".jpg,.jpeg,.png,.webp,.gif")
+        self.allowed_formats = {
+            self._canonical(ext if ext.startswith(".") else f".{ext}")
+            for ext in (item.strip().lower() for item in extensions.split(","))
+            if ext
+        }
+
+    def _canonical(self, extension: str) -> str:
+        return EXTENSION_ALIASES.get(extension, extension)
+
+    def sniff(self, head: bytes) -> Optional[str]:
+        """Canonical extension of the image format ``head`` starts with, or None"""
+        if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return ".webp"
+        for extension, signatures in IMAGE_SIGNATURES.items():
+            if head.startswith(signatures):
+                return extension
+        return None
+
+    def too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"File exceeds the maximum size of {self.max_file_size / (1024 * 1024):g}MB"
+        )
+
+    def image_format(self, head: bytes) -> str:
+        """
+        Format of an upload from its leading bytes.
+
+        Raises:
+            HTTPException: 400 if it is not an allowed image type
+        """
+        image_format = self.sniff(head)
+        if image_format is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be an image")
+        if image_format not in self.allowed_formats:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported image type. Allowed: {', '.join(sorted(self.allowed_formats))}"
+            )
+        return image_format
+
+    def _copy(self, source: BinaryIO) -> Path:
+        """Blocking copy of one upload; runs in the thread pool"""
+        source.seek(0)
+        head = source.read(self.chunk_size)
+        image_format = self.image_format(head)
+
+        partial = media_store.partial_path()
+        digest = hashlib.sha256()
+        written = 0
+        try:
+            with open(partial, "wb") as buffer:
+                chunk = head
+                while chunk:
+                    written += len(chunk)
+                    if written > self.max_file_size:
+                        raise self.too_large()
+                    digest.update(chunk)
+                    buffer.write(chunk)
+                    chunk = source.read(self.chunk_size)
+            return media_store.put(partial, digest.hexdigest(), image_format)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    async def save(self, file: UploadFile) -> Path:
+        """
+        Stream one upload into the media store. Returns its content-addressed path.
+
+        Raises:
+            HTTPException: 400 if the file is not an allowed image, 413 if it is too large
+        """
+        if file.size is not None and file.size > self.max_file_size:
+            raise self.too_large()
+        return await run_in_threadpool(self._copy, file.file)
+
+    async def save_many(self, files: List[UploadFile]) -> list:
+        """Stream several uploads concurrently; each result is the saved path or the exception that rejected the file"""
+        return await asyncio.gather(
+            *(self.save(file) for file in files),
+            return_exceptions=True
+        )
+
+
+# Singleton instance
+image_uploader = ImageUploader()
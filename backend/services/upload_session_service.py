@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from services.media_service import media_store
+from services.upload_service import image_uploader
+
+load_dotenv()
+
+# Session metadata (<id>.json) and received bytes (<id>.part); a dot directory, so never served
+SESSIONS_DIR = Path("uploads/.sessions")
+
+
+class UploadSessions:
+    """Resumable chunked uploads for large image batches.
+
+    A client creates a session per file with its total size, then PUTs the
+    bytes in chunks, each at the offset the server has received so far. The
+    chunks are appended to ``uploads/.sessions/<id>.part`` as they stream
+    in, buffered up to UPLOAD_CHUNK_SIZE and written from the thread pool,
+    so nothing larger than one buffer is held in memory. After a dropped
+    connection the bytes already received are kept. The client asks for the
+    session's offset and continues from there. Appends to one session are
+    serialized (per process) and the offset is checked once the lock is held,
+    so a retried chunk racing the original is rejected instead of written
+    twice. Finalizing checks the size,
+    the image type and the client's SHA-256 of the whole file, then moves it
+    into the media store like a regular upload. Sessions expire after
+    UPLOAD_SESSION_TTL_SECONDS.
+    """
+
+    def __init__(self):
+        self.ttl_seconds = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", 86400))
+        self.directory = SESSIONS_DIR
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}  # upload id -> (lock, requests holding or awaiting it)
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.json"
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.part"
+
+    def _response(self, session: dict) -> dict:
+        return {
+            "upload_id": session["upload_id"],
+            "size": session["size"],
+            "offset": self._data_path(session["upload_id"]).stat().st_size,
+            "filename": session.get("filename"),
+            "expires_at": session["expires_at"],
+        }
+
+    def _remove(self, upload_id: str):
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        self._data_path(upload_id).unlink(missing_ok=True)
+
+    def _sweep(self):
+        """Delete expired sessions"""
+        now = datetime.utcnow()
+        for meta_path in self.directory.glob("*.json"):
+            try:
+                with open(meta_path) as f:
+                    expired = datetime.fromisoformat(json.load(f)["expires_at"]) < now
+            except (OSError, ValueError, KeyError):
+                expired = True  # Metadata is written atomically, so unreadable means corrupt
+            if expired:
+                self._remove(meta_path.stem)
+
+    # Session lifecycle
+
+    def create(self, owner_id: str, size: int, filename: Optional[str]) -> dict:
+        if size > image_uploader.max_file_size:
+            raise image_uploader.too_large()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sweep()
+
+        upload_id = uuid.uuid4().hex
+        session = {
+            "upload_id": upload_id,
+            "owner_id": owner_id,
+            "size": size,
+            "filename": filename,
+            "expires_at": (datetime.utcnow() + timedelta(seconds=self.ttl_seconds)).isoformat(),
+        }
+        self._data_path(upload_id).touch()
+        partial = self.directory / f".{upload_id}.json.part"
+        with open(partial, "w") as f:
+            json.dump(session, f)
+        os.replace(partial, self._meta_path(upload_id))
+        return self._response(session)
+
+    def get(self, upload_id: str, owner_id: str) -> dict:
+        """
+        Load a session owned by ``owner_id``.
+
+        Raises:
+            HTTPException: 404 if it does not exist, belongs to someone else or has expired
+        """
+        session = None
+        if upload_id.isalnum():
+            try:
+                with open(self._meta_path(upload_id)) as f:
+                    session = json.load(f)
+            except (OSError, ValueError):
+                session = None
+
+        if session is not None and datetime.fromisoformat(session["expires_at"]) < datetime.utcnow():
+            self._remove(upload_id)
+            session = None
+        if session is None or session["owner_id"] != owner_id or not self._data_path(upload_id).exists():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+        return session
+
+    def status(self, session: dict) -> dict:
+        return self._response(session)
+
+    def abort(self, session: dict):
+        self._remove(session["upload_id"])
+
+    # Data
+
+    @asynccontextmanager
+    async def _append_lock(self, upload_id: str):
+        lock, users = self._locks.get(upload_id, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[upload_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[upload_id]
+            if users > 1:
+                self._locks[upload_id] = (lock, users - 1)
+            else:
+                del self._locks[upload_id]
+
+    async def append(self, session: dict, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+        """
+        Append a streamed chunk that starts at ``offset``.
+
+        Raises:
+            HTTPException: 409 if ``offset`` is not the number of bytes received so far,
+                413 if the chunk runs past the declared size, 404 if the session was deleted meanwhile
+        """
+        path = self._data_path(session["upload_id"])
+        async with self._append_lock(session["upload_id"]):
+            try:
+                received = path.stat().st_size  # Checked under the lock: a concurrent append may have moved it
+            except FileNotFoundError:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found")
+            if offset != received:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Chunk offset {offset} does not match the {received} bytes received so far"
+                )
+
+            buffer = bytearray()
+            f = await run_in_threadpool(open, path, "ab")
+            try:
+                async for chunk in chunks:
+                    if received + len(buffer) + len(chunk) > session["size"]:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                            detail=f"Chunk runs past the declared size of {session['size']} bytes"
+                        )
+                    buffer.extend(chunk)
+                    if len(buffer) >= image_uploader.chunk_size:
+                        await run_in_threadpool(f.write, bytes(buffer))
+                        received += len(buffer)
+                        buffer.clear()
+            finally:
+                # Keep whatever arrived before a disconnect or an oversized chunk, so the client can resume
+                if buffer:
+                    await run_in_threadpool(f.write, bytes(buffer))
+                await run_in_threadpool(f.close)
+        return self._response(session)
+
+    def finalize(self, session: dict, sha256: str) -> Path:
+        """
+        Verify a complete upload and move it into the media store (blocking; run in the thread pool).
+
+        Raises:
+            HTTPException: 409 if bytes are missing, 400 if it is not an allowed image or the checksum differs
+        """
+        upload_id = session["upload_id"]
+        path = self._data_path(upload_id)
+        received = path.stat().st_size
+        if received != session["size"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {received} of {session['size']} bytes received"
+            )
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            head = f.read(image_uploader.chunk_size)
+            chunk = head
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(image_uploader.chunk_size)
+
+        try:
+            image_format = image_uploader.image_format(head)
+        except HTTPException:
+            self._remove(upload_id)
+            raise
+        if digest.hexdigest() != sha256.lower():
+            self._remove(upload_id)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Checksum mismatch; the upload was discarded"
+            )
+
+        stored = media_store.put(path, digest.hexdigest(), image_format)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        return stored
+
+
+# Singleton instance
+upload_sessions = UploadSessions()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The app reads its configuration and creates uploads/ relative to the working directory on import
+WORK_DIR = tempfile.mkdtemp(prefix="bookit-tests-")
+os.chdir(WORK_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}"
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_dummy")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ["IMAGE_DERIVATIVES_ENABLED"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+import main
+import models
+from auth.auth import create_access_token
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def db():
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user; returns (user, auth headers)"""
+    def make(role=models.UserRole.USER, full_name=None):
+        name = f"user{uuid.uuid4().hex[:12]}"
+        user = models.User(
+            email=f"{name}@example.com",
+            username=name,
+            full_name=full_name,
+            role=role,
+            is_active=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user, {"Authorization": f"Bearer {create_access_token({'sub': user.email})}"}
+    return make
+
+
+@pytest.fixture
+def make_hotel(db):
+    def make(owner, **values):
+        fields = dict(
+            name=f"Hotel {uuid.uuid4().hex[:8]}",
+            address="1 Main Street",
+            city="Lisbon",
+            country="Portugal",
+            price_per_night=120.0,
+            rating=4.0,
+            total_rooms=10,
+            available_rooms=10,
+            images=[],
+            amenities=[],
+            owner_id=owner.id
+        )
+        fields.update(values)
+        hotel = models.Hotel(**fields)
+        db.add(hotel)
+        db.commit()
+        db.refresh(hotel)
+        return hotel
+    return make
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements executed inside it"""
+    @contextmanager
+    def count():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(database.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(database.engine, "before_cursor_execute", record)
+    return count
@@ -0,0 +1,28 @@
+"""init_database: a failing index must not stop the others from being created."""
+from sqlalchemy import text
+
+import database
+from services.hotel_indexes import hotel_indexes
+
+
+class _BrokenIndex:
+    def ensure_index(self, conn):
+        conn.execute(text("CREATE INDEX idx_broken ON no_such_table(id)"))
+
+
+class _LateIndex:
+    def ensure_index(self, conn):
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_hotels_test_late ON hotels(name, id)"))
+
+
+def test_failing_hotel_index_does_not_skip_later_ones(monkeypatch, capsys):
+    monkeypatch.setattr(hotel_indexes, "indexes", [_BrokenIndex(), _LateIndex()])
+
+    with database.engine.connect() as conn:
+        hotel_indexes.ensure(conn)
+        created = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_hotels_test_late'")).first()
+        conn.execute(text("DROP INDEX idx_hotels_test_late"))
+        conn.commit()
+
+    assert created is not None
+    assert "Failed to create the _BrokenIndex index" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+"""Facet counts on GET /api/hotels/?facets=... cover the whole filtered set."""
+import uuid
+
+import models
+
+
+def test_facets_count_the_filtered_hotels(client, db, make_user):
+    owner, headers = make_user(models.UserRole.OWNER)
+    city = f"Facetville {uuid.uuid4().hex[:8]}"
+    hotels = [
+        dict(price_per_night=40, amenities=["wifi", "pool"]),
+        dict(price_per_night=80, amenities=["wifi"]),
+        dict(price_per_night=150, discount_percentage=20, is_deal=True, amenities=["wifi", "spa"]),
+        dict(price_per_night=900, amenities=[]),
+    ]
+    ids = []
+    for values in hotels:
+        body = dict(name="Facet Hotel", address="1 Main Street", city=city, country="Portugal", total_rooms=5, **values)
+        response = client.post("/api/hotels/", json=body, headers=headers)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    for hotel_id, stars in zip(ids, (3, 4, 4, None)):
+        db.get(models.Hotel, hotel_id).star_rating = stars
+    db.commit()
+
+    response = client.get("/api/hotels/", params={"city": city, "facets": "city,star_rating,price,deal,amenity", "limit": 1})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["total"] == 4
+    assert len(body["hotels"]) == 1
+    assert body["facets"] == {
+        "city": {city: 4},
+        "star_rating": {"4": 2, "3": 1},
+        "price": {"0-50": 1, "50-100": 1, "100-200": 1, "200-500": 0, "500+": 1},
+        "deal": {"false": 3, "true": 1},
+        "amenity": {"wifi": 3, "pool": 1, "spa": 1},
+    }
+
+
+def test_only_requested_facets_are_queried(client, count_queries):
+    with count_queries() as statements:
+        response = client.get("/api/hotels/", params={"facets": "city", "limit": 1, "sort_by": "name"})
+
+    assert response.status_code == 200, response.text
+    assert set(response.json()["facets"]) == {"city"}
+    grouped = [statement for statement in statements if "GROUP BY" in statement]
+    assert len(grouped) == 1
+    assert "amenities" not in grouped[0] and "effective_price_per_night" not in grouped[0]
@@ -0,0 +1,41 @@
+"""Bulk hotel import: validation errors and per-row reporting of rejected inserts."""
+import json
+
+import models
+
+
+def _ndjson(*rows):
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+def _hotel(name, **values):
+    row = {"name": name, "address": "1 Main Street", "city": "Porto", "country": "Portugal", "price_per_night": 90, "total_rooms": 8}
+    row.update(values)
+    return row
+
+
+def test_failed_batch_reports_only_the_rejected_rows(client, db, make_user):
+    owner, headers = make_user(models.UserRole.OWNER)
+    body = _ndjson(
+        _hotel("Import One"),
+        _hotel("Import Two", total_rooms=10 ** 20),  # Passes validation, too large for an SQLite INTEGER
+        _hotel("Import Three"),
+        {"name": "Missing fields"},
+    )
+
+    response = client.post(
+        "/api/hotels/bulk?format=ndjson",
+        files={"file": ("hotels.ndjson", body, "application/x-ndjson")},
+        headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (4, 2, 2)
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert set(errors) == {2, 4}
+    assert errors[2][0].startswith("Insert failed:")
+    assert not any(message.startswith("Insert failed") for message in errors[4])
+
+    names = {name for (name,) in db.query(models.Hotel.name).filter(models.Hotel.owner_id == owner.id)}
+    assert names == {"Import One", "Import Three"}
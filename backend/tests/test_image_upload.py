@@ -0,0 +1,155 @@
+"""Image uploads: type sniffing from the file's bytes and size limits."""
+import hashlib
+import io
+import os
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+import models
+from services.image_service import generate_variants, image_derivatives
+from services.media_service import media_store
+from services.upload_service import image_uploader
+
+
+def _image_bytes(image_format="PNG", size=(8, 8), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def _random_png(side):
+    """A PNG that does not compress below side * side * 3 bytes"""
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (side, side), os.urandom(side * side * 3)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def owner_headers(make_user):
+    return make_user(models.UserRole.OWNER)[1]
+
+
+@pytest.mark.parametrize("head,expected", [
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00", ".png"),
+    (b"GIF89a\x01\x00", ".gif"),
+    (b"RIFF\x24\x00\x00\x00WEBPVP8 ", ".webp"),
+    (b"BM\x36\x00", ".bmp"),
+    (b"%PDF-1.7", None),
+    (b"RIFF\x24\x00\x00\x00WAVEfmt ", None),
+    (b"", None),
+])
+def test_sniff_recognizes_image_signatures(head, expected):
+    assert image_uploader.sniff(head) == expected
+
+
+def test_upload_is_typed_by_content_not_name(client, owner_headers):
+    content = _image_bytes("PNG")
+
+    response = client.post(
+        "/api/hotels/upload-image",
+        files={"file": ("notes.txt", content, "text/plain")},
+        headers=owner_headers
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["sha256"] == hashlib.sha256(content).hexdigest()
+    assert body["filename"].endswith(".png")
+    assert Path(body["image_url"].lstrip("/")).read_bytes() == content
+
+
+@pytest.mark.parametrize("content,detail", [
+    (b"<?php echo 'not an image'; ?>", "File must be an image"),
+    (_image_bytes("BMP"), "Unsupported image type"),  # A real image, but not in ALLOWED_EXTENSIONS
+])
+def test_upload_rejects_files_that_are_not_allowed_images(client, owner_headers, content, detail):
+    response = client.post(
+        "/api/hotels/upload-image",
+        files={"file": ("photo.jpg", content, "image/jpeg")},
+        headers=owner_headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
+
+
+def test_oversized_upload_is_rejected_without_leaving_files(client, owner_headers, monkeypatch):
+    monkeypatch.setattr(image_uploader, "max_file_size", 4096)
+    monkeypatch.setattr(image_uploader, "chunk_size", 1024)
+    content = _random_png(64)
+    assert len(content) > 4096
+    partial_dir = media_store.root / ".partial"
+    partials_before = set(partial_dir.iterdir()) if partial_dir.exists() else set()
+
+    response = client.post(
+        "/api/hotels/upload-image",
+        files={"file": ("big.png", content, "image/png")},
+        headers=owner_headers
+    )
+
+    assert response.status_code == 413
+    assert not media_store.path_for(hashlib.sha256(content).hexdigest(), ".png").exists()
+    assert (set(partial_dir.iterdir()) if partial_dir.exists() else set()) == partials_before
+
+
+def test_multi_upload_reports_rejected_files(client, owner_headers):
+    response = client.post(
+        "/api/hotels/upload-images",
+        files=[
+            ("files", ("a.jpg", _image_bytes("JPEG"), "image/jpeg")),
+            ("files", ("b.png", b"not an image at all", "image/png")),
+        ],
+        headers=owner_headers
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [image["original_filename"] for image in body["uploaded_images"]] == ["a.jpg"]
+    assert [image["original_filename"] for image in body["rejected_images"]] == ["b.png"]
+
+
+def test_copy_stops_once_the_stream_exceeds_the_limit(monkeypatch):
+    # Streams whose size is not declared up front are cut off while they are copied
+    monkeypatch.setattr(image_uploader, "max_file_size", 4096)
+    monkeypatch.setattr(image_uploader, "chunk_size", 1024)
+    content = _random_png(64)
+
+    with pytest.raises(HTTPException) as raised:
+        image_uploader._copy(io.BytesIO(content))
+
+    assert raised.value.status_code == 413
+    assert not media_store.path_for(hashlib.sha256(content).hexdigest(), ".png").exists()
+
+
+def _finished_derivatives(url):
+    """Generate an image's derivatives in-process; returns the job's Future"""
+    future = Future()
+    future.set_result(generate_variants(str(image_derivatives.path_for(url)), url, 80, 82))
+    return future
+
+
+def test_finished_derivatives_are_recorded_on_referencing_hotels(db, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    url = media_store.url_for(image_uploader._copy(io.BytesIO(_random_png(64))))
+    hotel = make_hotel(owner, images=[url])
+    assert hotel.image_variants is None
+
+    image_derivatives._attach(url, _finished_derivatives(url))
+
+    db.expire_all()
+    assert set(hotel.image_variants[url]) == {"full", "card", "thumb"}
+
+
+def test_finished_derivatives_of_unreferenced_uploads_skip_the_hotel_scan(count_queries):
+    url = media_store.url_for(image_uploader._copy(io.BytesIO(_random_png(64))))
+    future = _finished_derivatives(url)
+
+    with count_queries() as statements:
+        image_derivatives._attach(url, future)
+
+    assert not any("FROM hotels" in statement for statement in statements)
@@ -0,0 +1,107 @@
+"""Content-addressed media: reference counting through hotel writes and garbage collection."""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+from services.media_service import media_store
+
+
+def _put(content):
+    partial = media_store.partial_path()
+    partial.write_bytes(content)
+    return media_store.put(partial, hashlib.sha256(content).hexdigest(), ".jpg")
+
+
+@pytest.fixture
+def stored():
+    """Store a new media file; returns its URL"""
+    def store():
+        return media_store.url_for(_put(os.urandom(256)))
+    return store
+
+
+def _media(db, url):
+    db.expire_all()
+    return db.get(models.MediaObject, media_store.sha256_of(url))
+
+
+def _age(db, url, days):
+    media = _media(db, url)
+    media.updated_at = datetime.utcnow() - timedelta(days=days)
+    db.commit()
+
+
+def test_ref_count_follows_attach_detach_and_delete(db, make_user, make_hotel, stored):
+    owner, _ = make_user(models.UserRole.OWNER)
+    url, other_url = stored(), stored()
+    assert _media(db, url).ref_count == 0
+
+    first = make_hotel(owner, images=[url, url])  # Listed twice, counted once
+    second = make_hotel(owner, images=[url, other_url])
+    assert (_media(db, url).ref_count, _media(db, other_url).ref_count) == (2, 1)
+
+    second.images = [other_url]
+    db.commit()
+    assert (_media(db, url).ref_count, _media(db, other_url).ref_count) == (1, 1)
+
+    db.delete(first)
+    db.commit()
+    assert (_media(db, url).ref_count, _media(db, other_url).ref_count) == (0, 1)
+
+
+def test_collect_respects_the_grace_period(db, make_user, make_hotel, stored):
+    owner, _ = make_user(models.UserRole.OWNER)
+    fresh, stale, referenced = stored(), stored(), stored()
+    make_hotel(owner, images=[referenced])
+    _age(db, stale, days=2)
+    _age(db, referenced, days=2)
+
+    media_store.collect(db, grace_seconds=86400)
+
+    assert _media(db, fresh) is not None
+    assert _media(db, referenced) is not None
+    assert _media(db, stale) is None
+    assert not os.path.exists(stale.lstrip("/"))
+    assert os.path.exists(fresh.lstrip("/"))
+
+
+def test_reupload_restarts_the_grace_period(db):
+    content = os.urandom(256)
+    url = media_store.url_for(_put(content))
+    _age(db, url, days=2)
+
+    _put(content)
+    media_store.collect(db, grace_seconds=86400)
+
+    assert _media(db, url) is not None
+    assert os.path.exists(url.lstrip("/"))
+
+
+def test_reupload_during_collection_keeps_the_file(db, monkeypatch):
+    content = os.urandom(256)
+    url = media_store.url_for(_put(content))
+    _age(db, url, days=2)
+    remove_files = media_store._remove_files
+    reupload = []
+
+    def remove_while_uploading(sha256, extension):
+        # The same bytes are uploaded again after collect() claimed the row, before it deletes the files
+        thread = threading.Thread(target=lambda: reupload.append(_put(content)))
+        thread.start()
+        reupload.append(thread)
+        time.sleep(0.1)
+        remove_files(sha256, extension)
+
+    monkeypatch.setattr(media_store, "_remove_files", remove_while_uploading)
+    assert media_store.collect(db, grace_seconds=86400) == 1
+    reupload[0].join(timeout=10)
+
+    assert media_store.url_for(reupload[1]) == url
+    assert os.path.exists(url.lstrip("/"))
+    media = _media(db, url)
+    assert media is not None and media.ref_count == 0
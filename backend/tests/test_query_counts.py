@@ -0,0 +1,79 @@
+"""Listing endpoints must run a fixed number of statements however many rows they return (no N+1 loads)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import models
+
+N = 3
+
+LISTINGS = [
+    ("/api/hotels/", "user"),
+    ("/api/hotels/?fields=summary", "user"),
+    ("/api/hotels/owner/my-hotels", "owner"),
+    ("/api/favorites/", "user"),
+    ("/api/favorites/hotels", "user"),
+    ("/api/bookings/", "user"),
+    ("/api/bookings/owner/hotel-bookings", "owner"),
+    ("/api/reviews/hotel/{hotel_id}?limit=50", "user"),
+    ("/api/reviews/user/my-reviews?limit=50", "user"),
+    ("/api/reviews/owner/my-hotels-reviews?limit=50", "owner"),
+]
+
+
+@pytest.fixture
+def catalog(db, make_user, make_hotel):
+    """An owner and a guest; ``grow(n)`` adds n hotels the guest has favorited, booked and reviewed"""
+    owner, owner_headers = make_user(models.UserRole.OWNER, full_name="Olive Owner")
+    guest, guest_headers = make_user(full_name="Gus Guest")
+    first_hotel = make_hotel(owner)
+
+    def grow(n):
+        for _ in range(n):
+            hotel = make_hotel(owner)
+            check_in = datetime.utcnow() + timedelta(days=7)
+            bookings = [
+                models.Booking(
+                    user_id=guest.id,
+                    hotel_id=stayed_at.id,
+                    check_in_date=check_in,
+                    check_out_date=check_in + timedelta(days=2),
+                    guests=2,
+                    total_price=240.0,
+                    status=models.BookingStatus.CHECKED_OUT
+                )
+                for stayed_at in (hotel, first_hotel)
+            ]
+            db.add_all(bookings + [models.UserFavoriteHotel(user_id=guest.id, hotel_id=hotel.id)])
+            db.flush()
+            for booking in bookings:  # One review per booking
+                db.add(models.Review(
+                    user_id=guest.id,
+                    hotel_id=booking.hotel_id,
+                    booking_id=booking.id,
+                    rating=5,
+                    comment="Lovely stay"
+                ))
+            db.commit()
+
+    headers = {"owner": owner_headers, "user": guest_headers}
+    return grow, headers, first_hotel.id
+
+
+@pytest.mark.parametrize("path,role", LISTINGS)
+def test_listing_query_count_does_not_grow_with_rows(client, catalog, count_queries, path, role):
+    grow, headers, hotel_id = catalog
+    url = path.format(hotel_id=hotel_id)
+
+    def run():
+        with count_queries() as statements:
+            response = client.get(url, headers=headers[role])
+        assert response.status_code == 200, response.text
+        return statements
+
+    grow(N)
+    small = run()
+    grow(2 * N)
+    large = run()
+
+    assert len(large) == len(small), "\n".join(large)
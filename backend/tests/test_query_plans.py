@@ -0,0 +1,101 @@
+"""Hot read paths must be served from indexes: EXPLAIN QUERY PLAN may not show a full table scan."""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import database
+import models
+
+TABLES = set(database.Base.metadata.tables)
+
+# "SCAN hotels", or "SCAN hotels_1" for a SQLAlchemy alias, without "USING [COVERING] INDEX ..."
+FULL_SCAN = re.compile(r"^SCAN (\w+?)(?:_\d+)?$")
+
+HOT_PATHS = [
+    # routes/hotels.py
+    ("/api/hotels/", "user"),
+    ("/api/hotels/?sort_by=price", "user"),
+    ("/api/hotels/?sort_by=rating&sort_desc=true", "user"),
+    ("/api/hotels/?city=Lisbon&min_rating=3", "user"),
+    ("/api/hotels/deals", "user"),
+    ("/api/hotels/search?q=Lisbon", "user"),
+    ("/api/hotels/owner/my-hotels", "owner"),
+    ("/api/hotels/{hotel_id}", "user"),
+    ("/api/hotels/{hotel_id}/detail", "user"),
+    # routes/bookings.py
+    ("/api/bookings/", "user"),
+    ("/api/bookings/owner/hotel-bookings", "owner"),
+    # routes/analytics.py
+    ("/api/analytics/overview", "owner"),
+    ("/api/analytics/revenue-trend", "owner"),
+    ("/api/analytics/bookings-trend", "owner"),
+    ("/api/analytics/guest-ratings", "owner"),
+    ("/api/analytics/revenue-breakdown", "owner"),
+    ("/api/analytics/checkout-performance", "owner"),
+    ("/api/analytics/guest-lifecycle", "owner"),
+    ("/api/analytics/hotels", "owner"),
+]
+
+
+@pytest.fixture
+def catalog(db, make_user, make_hotel):
+    owner, owner_headers = make_user(models.UserRole.OWNER, full_name="Olive Owner")
+    guest, guest_headers = make_user()
+    hotel = None
+    for rating in (3.5, 4.0, 4.5):
+        hotel = make_hotel(owner, rating=rating)
+        check_in = datetime.utcnow() - timedelta(days=3)
+        booking = models.Booking(
+            user_id=guest.id,
+            hotel_id=hotel.id,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=2),
+            guests=2,
+            total_price=240.0,
+            status=models.BookingStatus.CHECKED_OUT
+        )
+        db.add(booking)
+        db.flush()
+        db.add(models.Review(user_id=guest.id, hotel_id=hotel.id, booking_id=booking.id, rating=4, comment="Good"))
+        db.commit()
+    return {"owner": owner_headers, "user": guest_headers}, hotel.id
+
+
+def _full_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    scans = []
+    for row in plan:
+        match = FULL_SCAN.match(row[-1])
+        if match and match.group(1) in TABLES:
+            scans.append(row[-1])
+    return scans
+
+
+@pytest.mark.parametrize("path,role", HOT_PATHS)
+def test_hot_queries_use_indexes(client, catalog, path, role):
+    if database.engine.dialect.name != "sqlite":
+        pytest.skip("Plans are checked with SQLite's EXPLAIN QUERY PLAN")
+    headers, hotel_id = catalog
+
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            executed.append((statement, parameters))
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path.format(hotel_id=hotel_id), headers=headers[role])
+    finally:
+        event.remove(database.engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+
+    failures = []
+    with database.engine.connect() as conn:
+        for statement, parameters in executed:
+            scans = _full_scans(conn, statement, parameters)
+            if scans:
+                failures.append(f"{', '.join(scans)}\n    {' '.join(statement.split())}")
+    assert not failures, "Full table scans:\n" + "\n".join(failures)
@@ -0,0 +1,82 @@
+"""Conditional requests and namespace invalidation of cached hotel responses."""
+import models
+
+
+def _get(client, url, etag=None, headers=None):
+    headers = dict(headers or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+
+def test_matching_if_none_match_is_not_modified(client, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    hotel = make_hotel(owner)
+
+    for url in (f"/api/hotels/{hotel.id}", f"/api/hotels/{hotel.id}/detail", "/api/hotels/"):
+        first = _get(client, url)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        second = _get(client, url, etag)
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert not second.content
+
+
+def test_update_changes_etag(client, db, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    hotel = make_hotel(owner)
+    url = f"/api/hotels/{hotel.id}"
+    etag = _get(client, url).headers["ETag"]
+    listing_etag = _get(client, "/api/hotels/").headers["ETag"]
+
+    hotel.name = "Renamed Hotel"
+    db.commit()
+
+    response = _get(client, url, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "Renamed Hotel"
+    assert _get(client, "/api/hotels/", listing_etag).status_code == 200
+
+
+def test_booking_availability_only_invalidates_the_hotel(client, db, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    hotel = make_hotel(owner, available_rooms=2)
+    other = make_hotel(owner)
+    etag = _get(client, f"/api/hotels/{hotel.id}").headers["ETag"]
+    other_etag = _get(client, f"/api/hotels/{other.id}").headers["ETag"]
+    listing_etag = _get(client, "/api/hotels/").headers["ETag"]
+
+    hotel.available_rooms -= 1
+    db.commit()
+
+    assert _get(client, f"/api/hotels/{hotel.id}", etag).json()["available_rooms"] == 1
+    assert _get(client, f"/api/hotels/{other.id}", other_etag).status_code == 304
+    assert _get(client, "/api/hotels/", listing_etag).status_code == 304
+
+    # Selling out changes which hotels listings (e.g. deals) include
+    hotel.available_rooms -= 1
+    db.commit()
+
+    assert _get(client, "/api/hotels/", listing_etag).status_code == 200
+
+
+def test_detail_is_private_and_follows_favorites(client, db, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    guest, headers = make_user()
+    hotel = make_hotel(owner)
+    url = f"/api/hotels/{hotel.id}/detail"
+
+    first = _get(client, url, headers=headers)
+    assert first.headers["Cache-Control"].startswith("private")
+    assert first.json()["is_favorite"] is False
+
+    db.add(models.UserFavoriteHotel(user_id=guest.id, hotel_id=hotel.id))
+    db.commit()
+
+    second = _get(client, url, first.headers["ETag"], headers=headers)
+    assert second.status_code == 200
+    assert second.json()["is_favorite"] is True
+    assert _get(client, url).json()["is_favorite"] is False
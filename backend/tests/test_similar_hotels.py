@@ -0,0 +1,33 @@
+"""Similar hotels are served from the batch-computed table, never computed by a request."""
+import uuid
+
+import models
+from services.similarity_service import similar_hotels
+
+
+def _neighbours(db, hotel_id):
+    db.expire_all()
+    return db.query(models.HotelSimilarity).filter(models.HotelSimilarity.hotel_id == hotel_id).count()
+
+
+def test_requests_only_read_precomputed_neighbours(client, db, make_user, make_hotel):
+    owner, _ = make_user(models.UserRole.OWNER)
+    city = f"Simcity {uuid.uuid4().hex[:8]}"
+    hotel, *others = [make_hotel(owner, city=city, rating=rating) for rating in (4.0, 4.5, 3.0)]
+
+    response = client.get(f"/api/hotels/{hotel.id}/similar")
+    assert response.status_code == 200, response.text
+    # Not in the table yet: best-rated hotels in the same city
+    assert [item["id"] for item in response.json()] == [others[0].id, others[1].id]
+    assert _neighbours(db, hotel.id) == 0
+
+    similar_hotels.rebuild(db)
+
+    assert _neighbours(db, hotel.id) == min(similar_hotels.k, db.query(models.Hotel).count() - 1)
+    response = client.get(f"/api/hotels/{hotel.id}/similar", params={"limit": 50})
+    stored = [
+        row.similar_hotel_id for row in db.query(models.HotelSimilarity)
+        .filter(models.HotelSimilarity.hotel_id == hotel.id)
+        .order_by(models.HotelSimilarity.rank).limit(50)
+    ]
+    assert [item["id"] for item in response.json()] == stored
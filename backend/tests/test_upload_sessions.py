@@ -0,0 +1,43 @@
+"""Resumable uploads: concurrent chunks for one session and the declared size limit."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from services.upload_session_service import upload_sessions
+
+
+async def _chunks(*parts):
+    for part in parts:
+        await asyncio.sleep(0)  # Yield to the other request between parts
+        yield part
+
+
+def _run_concurrently(*coroutines):
+    async def gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+    return asyncio.run(gather())
+
+
+def test_racing_appends_at_the_same_offset_write_once():
+    session = upload_sessions.create("owner-1", 1000, "photo.jpg")
+
+    results = _run_concurrently(
+        upload_sessions.append(session, 0, _chunks(b"a" * 50, b"b" * 50)),
+        upload_sessions.append(session, 0, _chunks(b"a" * 50, b"b" * 50)),
+    )
+
+    conflicts = [result for result in results if isinstance(result, HTTPException)]
+    assert len(conflicts) == 1 and conflicts[0].status_code == 409
+    assert upload_sessions.status(session)["offset"] == 100
+    assert not upload_sessions._locks
+
+
+def test_chunk_past_the_declared_size_is_rejected():
+    session = upload_sessions.create("owner-1", 10, "photo.jpg")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(upload_sessions.append(session, 0, _chunks(b"x" * 6, b"y" * 6)))
+
+    assert raised.value.status_code == 413
+    assert upload_sessions.status(session)["offset"] == 6  # What fitted is kept for resuming
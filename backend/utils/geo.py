@@ -0,0 +1,63 @@
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1: Optional[float], lon1: Optional[float], lat2: Optional[float], lon2: Optional[float]) -> Optional[float]:
+    """
+    Calculate the great circle distance between two points
+    on the earth (specified in decimal degrees) using Haversine formula.
+
+    Also registered as the ``haversine_km`` SQL function on SQLite connections.
+
+    Returns:
+        Optional[float]: Distance in kilometers, or None if any coordinate is missing
+    """
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+
+    # Convert decimal degrees to radians
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    c = 2 * math.asin(min(1.0, math.sqrt(a)))
+
+    return c * EARTH_RADIUS_KM
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Compute a bounding box that contains every point within ``radius_km`` of (lat, lon).
+
+    Longitude degrees shrink with latitude, so the longitude span is widened by
+    1 / cos(lat). Boxes crossing the antimeridian are split in two.
+
+    Returns:
+        Tuple: (min_lat, max_lat, [(min_lon, max_lon), ...])
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    # Use the latitude closest to a pole, where longitude degrees are shortest
+    extreme_lat = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(extreme_lat))
+    if extreme_lat >= 90.0 or cos_lat <= 1e-9:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if dlon >= 180.0:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+
+    min_lon = lon - dlon
+    max_lon = lon + dlon
+    if min_lon < -180.0:
+        return min_lat, max_lat, [(min_lon + 360.0, 180.0), (-180.0, max_lon)]
+    if max_lon > 180.0:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360.0)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
@@ -0,0 +1,160 @@
+import base64
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, false, literal, String
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+    return value
+
+
+def encode_cursor(sort_key: str, values: Sequence[Any]) -> str:
+    """
+    Build an opaque cursor from the sort key values of the last row on a page.
+
+    Args:
+        sort_key (str): Identifies the ordering the cursor belongs to
+        values (Sequence[Any]): Values of every ORDER BY term, id last
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = json.dumps({"s": sort_key, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or was issued for another ordering
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values = [_decode_value(v) for v in payload["v"]]
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if payload.get("s") != sort_key:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort order"
+        )
+    return values
+
+
+def _bind_value(value: Any, dialect_name: str) -> Any:
+    # SQLite stores datetimes as text, either from CURRENT_TIMESTAMP (no fraction) or from
+    # SQLAlchemy (with microseconds); compare against the same text form instead of letting
+    # the DateTime type re-render the value with a fraction that breaks equality.
+    if dialect_name == "sqlite" and isinstance(value, datetime):
+        text_value = value.strftime("%Y-%m-%d %H:%M:%S")
+        if value.microsecond:
+            text_value += f".{value.microsecond:06d}"
+        return literal(text_value, String())
+    if isinstance(value, bool):
+        # SQLAlchemy only allows equality operators against True/False constants
+        return literal(int(value))
+    return value
+
+
+def _nulls_sort_low(dialect_name: str) -> bool:
+    # SQLite and MySQL treat NULL as the smallest value, Postgres as the largest
+    return dialect_name != "postgresql"
+
+
+def _after(col, value, desc: bool, nulls_low: bool):
+    """Rows strictly after ``value`` for a single ORDER BY term"""
+    nulls_last = nulls_low == desc
+    if value is None:
+        return false() if nulls_last else col.isnot(None)
+
+    after = col < value if desc else col > value
+    if nulls_last:
+        return or_(after, col.is_(None))
+    return after
+
+
+def _equal(col, value):
+    return col.is_(None) if value is None else col == value
+
+
+def keyset_filter(order: Sequence[Tuple[Any, bool]], values: Sequence[Any], dialect_name: str):
+    """
+    Build the WHERE clause selecting rows that come after ``values`` in ``order``.
+
+    Args:
+        order: (column expression, descending) pairs, ending with a unique tiebreaker
+        values: Cursor values, one per ORDER BY term
+        dialect_name: Bound dialect, used to place NULLs the way the database sorts them
+    """
+    if len(order) != len(values):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    nulls_low = _nulls_sort_low(dialect_name)
+    values = [_bind_value(value, dialect_name) for value in values]
+    clauses = []
+    for i, (col, desc) in enumerate(order):
+        prefix = [_equal(order[j][0], values[j]) for j in range(i)]
+        clauses.append(and_(*prefix, _after(col, values[i], desc, nulls_low)))
+    return or_(*clauses)
+
+
+def keyset_paginate(
+    query,
+    order: Sequence[Tuple[Any, bool]],
+    sort_key: str,
+    cursor: Optional[str],
+    limit: int,
+    skip: int = 0,
+    row_values: Optional[Callable[[Any], List[Any]]] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Order a query and fetch one page using keyset (seek) pagination.
+
+    When ``cursor`` is given the page starts right after it, so every page costs
+    the same regardless of depth. Without a cursor ``skip`` is honoured for
+    backwards compatibility.
+
+    Returns:
+        Tuple[list, Optional[str]]: The page rows and the cursor for the next page (None on the last page)
+    """
+    query = query.order_by(*[col.desc() if desc else col.asc() for col, desc in order])
+
+    if cursor:
+        values = decode_cursor(cursor, sort_key)
+        dialect_name = query.session.get_bind().dialect.name
+        query = query.filter(keyset_filter(order, values, dialect_name))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if row_values is None:
+        row_values = lambda row: [getattr(row, col.key) for col, _ in order]
+    return rows, encode_cursor(sort_key, row_values(rows[-1]))
@@ -0,0 +1,84 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy.orm import joinedload, load_only
+import models
+import schemas
+
+# Response fields that are not plain Hotel columns
+_COMPUTED_FIELDS = {"owner_name", "distance_km", "main_image", "main_image_variants"}
+
+
+class HotelProjection:
+    """Sparse fieldset for hotel list endpoints (``fields=`` query parameter).
+
+    Only the columns backing the requested fields are loaded (``load_only``),
+    so list cards skip the description text and JSON blobs, and each hotel is
+    returned as a dict holding just those fields. ``fields=summary`` selects
+    the ``schemas.HotelSummary`` card fields.
+    """
+
+    allowed_fields = list(schemas.HotelResponse.model_fields) + ["main_image", "main_image_variants"]
+
+    def __init__(self, fields: List[str]):
+        self.fields = fields
+
+    @classmethod
+    def parse(cls, fields: Optional[str], include: Sequence[str] = ()) -> Optional["HotelProjection"]:
+        """
+        Parse a comma-separated ``fields`` parameter (None means full responses).
+
+        Args:
+            include: Fields the route needs in every projected item (e.g. currency when converting prices)
+        """
+        if not fields:
+            return None
+
+        names = []
+        for name in (name.strip() for name in fields.split(",")):
+            if name == "summary":
+                names.extend(schemas.HotelSummary.model_fields)
+            elif name:
+                names.append(name)
+
+        unknown = [name for name in names if name not in cls.allowed_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        names = list(dict.fromkeys(["id"] + names + list(include)))
+        return cls(names)
+
+    def options(self, *extra_columns) -> list:
+        """
+        Loader options for the projected columns.
+
+        Args:
+            extra_columns: Columns the route reads besides the response fields (e.g. ORDER BY terms for cursors)
+        """
+        columns = [getattr(models.Hotel, name) for name in self.fields if name not in _COMPUTED_FIELDS]
+        if "main_image" in self.fields or "main_image_variants" in self.fields:
+            columns.append(models.Hotel.images)
+        if "main_image_variants" in self.fields:
+            columns.append(models.Hotel.image_variants)
+        columns.extend(extra_columns)
+
+        options = [load_only(*dict.fromkeys(columns))]
+        if "owner_name" in self.fields:
+            options.append(joinedload(models.Hotel.owner).load_only(models.User.full_name, models.User.username))
+        return options
+
+    def _value(self, hotel: models.Hotel, name: str) -> Any:
+        if name == "owner_name":
+            owner = hotel.owner
+            return owner.full_name if owner and owner.full_name else (owner.username if owner else "Unknown Owner")
+        if name == "main_image":
+            return hotel.images[0] if hotel.images else None
+        if name == "main_image_variants":
+            return (hotel.image_variants or {}).get(hotel.images[0]) if hotel.images else None
+        value = getattr(hotel, name, None)
+        return float(value) if isinstance(value, Decimal) else value
+
+    def dump(self, hotels: List[models.Hotel]) -> List[Dict[str, Any]]:
+        return [{name: self._value(hotel, name) for name in self.fields} for hotel in hotels]